@@ -37,8 +37,16 @@ import numpy as np
 import math
 import copy
 import random
+import time
+import os
+import json
+import pickle
+import multiprocessing as mp
+import queue
+import threading
+import asyncio
 from IPython.display import clear_output
-from collections import deque
+from collections import OrderedDict
 
 """#Piece
 Piece est responsable de la représentation d'une piece individuelle.
@@ -182,116 +190,588 @@ class Pawn(Piece):
 
         return moves
 
+PIECE_CLASSES = [Pawn, Knight, Bishop, Rook, Queen, King]
+
+"""#Bitboards
+Représentation de la position par bitboards : un entier 64 bits par type de pièce et par couleur.
+
+Les cases sont indexées par sq = ligne*8 + colonne (ligne 0 = 8e rangée, côté noir), comme la grille de Board.
+Les attaques du cavalier, du roi et des pions sont précalculées ; celles des pièces glissantes sont lues
+dans des tables indexées par l'occupation masquée de chaque case (équivalent des tables « magiques »,
+le dictionnaire jouant le rôle de la multiplication magique).
+"""
+
+PIECE_TYPES = ('pawn', 'knight', 'bishop', 'rook', 'queen', 'king')
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+COLORS = ('white', 'black')
+WHITE, BLACK = 0, 1
+FULL_BB = (1 << 64) - 1
+SQUARE_COORDS = [(sq // 8, sq % 8) for sq in range(64)]
+
+# Droits de roque codés sur 4 bits
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+CASTLE_ALL = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+
+KING_OFFSETS = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
+KNIGHT_OFFSETS = [(-2,-1), (-1,-2), (1,-2), (2,-1), (2,1), (1,2), (-1,2), (-2,1)]
+ROOK_DIRECTIONS = [(-1,0), (1,0), (0,-1), (0,1)]
+BISHOP_DIRECTIONS = [(-1,-1), (-1,1), (1,-1), (1,1)]
+
+
+def _step_attacks(offsets):
+    table = []
+    for sq in range(64):
+        x, y = SQUARE_COORDS[sq]
+        bb = 0
+        for dx, dy in offsets:
+            if 0 <= x+dx < 8 and 0 <= y+dy < 8:
+                bb |= 1 << ((x+dx)*8 + y+dy)
+        table.append(bb)
+    return table
+
+
+def _slide_attacks(sq, occupied, directions):
+    # Version lente (case par case), utilisée uniquement pour remplir les tables
+    x, y = SQUARE_COORDS[sq]
+    bb = 0
+    for dx, dy in directions:
+        nx, ny = x + dx, y + dy
+        while 0 <= nx < 8 and 0 <= ny < 8:
+            bb |= 1 << (nx*8 + ny)
+            if occupied >> (nx*8 + ny) & 1:
+                break
+            nx += dx
+            ny += dy
+    return bb
+
+
+def _relevant_mask(sq, directions):
+    # Cases dont l'occupation influence les attaques (les bords sont exclus)
+    x, y = SQUARE_COORDS[sq]
+    bb = 0
+    for dx, dy in directions:
+        nx, ny = x + dx, y + dy
+        while 0 <= nx + dx < 8 and 0 <= ny + dy < 8:
+            bb |= 1 << (nx*8 + ny)
+            nx += dx
+            ny += dy
+    return bb
+
+
+def _slider_tables(directions):
+    masks, tables = [], []
+    for sq in range(64):
+        mask = _relevant_mask(sq, directions)
+        table = {}
+        subset = 0
+        while True:  # énumération de tous les sous-ensembles du masque (carry-rippler)
+            table[subset] = _slide_attacks(sq, subset, directions)
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+KNIGHT_ATTACKS = _step_attacks(KNIGHT_OFFSETS)
+KING_ATTACKS = _step_attacks(KING_OFFSETS)
+# Les blancs avancent vers la ligne 0, les noirs vers la ligne 7
+PAWN_ATTACKS = (_step_attacks([(-1,-1), (-1,1)]), _step_attacks([(1,-1), (1,1)]))
+ROOK_MASKS, ROOK_TABLES = _slider_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_TABLES = _slider_tables(BISHOP_DIRECTIONS)
+# Lignes du roi sur un échiquier vide : une pièce hors de ces lignes ne peut pas être clouée
+QUEEN_LINES = [ROOK_TABLES[sq][0] | BISHOP_TABLES[sq][0] for sq in range(64)]
+
+# Masques appliqués aux droits de roque quand une case de départ ou d'arrivée est touchée
+CASTLE_MASKS = [CASTLE_ALL] * 64
+CASTLE_MASKS[60] &= ~(CASTLE_WK | CASTLE_WQ)
+CASTLE_MASKS[63] &= ~CASTLE_WK
+CASTLE_MASKS[56] &= ~CASTLE_WQ
+CASTLE_MASKS[4] &= ~(CASTLE_BK | CASTLE_BQ)
+CASTLE_MASKS[7] &= ~CASTLE_BK
+CASTLE_MASKS[0] &= ~CASTLE_BQ
+
+# (droit, case du roi, case d'arrivée du roi, départ de la tour, arrivée de la tour, cases vides, cases non attaquées)
+CASTLING_MOVES = (
+    ((CASTLE_WK, 60, 62, 63, 61, (1 << 61) | (1 << 62), (60, 61, 62)),
+     (CASTLE_WQ, 60, 58, 56, 59, (1 << 57) | (1 << 58) | (1 << 59), (60, 59, 58))),
+    ((CASTLE_BK, 4, 6, 7, 5, (1 << 5) | (1 << 6), (4, 5, 6)),
+     (CASTLE_BQ, 4, 2, 0, 3, (1 << 1) | (1 << 2) | (1 << 3), (4, 3, 2))),
+)
+
+PROMOTION_PIECES = ('queen', 'rook', 'bishop', 'knight')
+PROMOTION_TYPES = {'queen': QUEEN, 'rook': ROOK, 'bishop': BISHOP, 'knight': KNIGHT}
+
+
+def rook_attacks(sq, occupied):
+    return ROOK_TABLES[sq][occupied & ROOK_MASKS[sq]]
+
+
+def bishop_attacks(sq, occupied):
+    return BISHOP_TABLES[sq][occupied & BISHOP_MASKS[sq]]
+
+
+def lsb(bb):
+    return (bb & -bb).bit_length() - 1
+
+
+# Clés de Zobrist : tirées avec une graine fixe pour que les hachages soient stables d'une exécution à l'autre
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = [[_zobrist_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOBRIST_CASTLING = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_EN_PASSANT = [_zobrist_rng.getrandbits(64) for _ in range(64)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
 """#Board
 Board est responsable de la représentation de l'échiquier et des mouvements des pièces.
 
-Gestion Avancée de l'État du Jeu
+Gestion Avancée de l'État du Jeu : la position est stockée dans des bitboards (voir ci-dessus),
+complétés par une mailbox de 64 cases pour retrouver en O(1) la pièce d'une case.
 """
 
 class Board:
     def __init__(self):
-        self.grid = np.empty((8,8), dtype=object)
+        self.pieces = [0] * 12        # un bitboard par (couleur, type) : index couleur*6 + type
+        self.occupancy = [0, 0]       # cases occupées par les blancs / les noirs
+        self.squares = [-1] * 64      # mailbox : index de la pièce sur chaque case, -1 si vide
         self.current_player = 'white'
         self.history = []
-        self.en_passant = None
-        self.castling_rights = {'white': {'kingside': True, 'queenside': True},
-                               'black': {'kingside': True, 'queenside': True}}
+        self.castling = CASTLE_ALL
+        self.ep_square = -1           # case de prise en passant, -1 si aucune
+        self.halfmove_clock = 0
+        self.hash = ZOBRIST_CASTLING[CASTLE_ALL]  # clé de Zobrist, mise à jour incrémentalement
         self._init_pieces()
 
     def _init_pieces(self):
         # Pawns
         for i in range(8):
-            self.grid[1][i] = Pawn('black', 'pawn')
-            self.grid[6][i] = Pawn('white', 'pawn')
+            self._put(BLACK*6 + PAWN, 8 + i)
+            self._put(WHITE*6 + PAWN, 48 + i)
 
         # Other pieces
-        pieces = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        for i, piece in enumerate(pieces):
-            self.grid[0][i] = piece('black', piece.__name__.lower())
-            self.grid[7][i] = piece('white', piece.__name__.lower())
+        pieces = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+        for i, ptype in enumerate(pieces):
+            self._put(BLACK*6 + ptype, i)
+            self._put(WHITE*6 + ptype, 56 + i)
+
+    def _put(self, index, sq):
+        bit = 1 << sq
+        self.pieces[index] |= bit
+        self.occupancy[index // 6] |= bit
+        self.squares[sq] = index
+        self.hash ^= ZOBRIST_PIECES[index][sq]
+
+    def _remove(self, sq):
+        index = self.squares[sq]
+        bit = 1 << sq
+        self.pieces[index] ^= bit
+        self.occupancy[index // 6] ^= bit
+        self.squares[sq] = -1
+        self.hash ^= ZOBRIST_PIECES[index][sq]
+        return index
+
+    @property
+    def turn(self):
+        return WHITE if self.current_player == 'white' else BLACK
+
+    @property
+    def en_passant(self):
+        return SQUARE_COORDS[self.ep_square] if self.ep_square >= 0 else None
+
+    @property
+    def castling_rights(self):
+        return {'white': {'kingside': bool(self.castling & CASTLE_WK), 'queenside': bool(self.castling & CASTLE_WQ)},
+                'black': {'kingside': bool(self.castling & CASTLE_BK), 'queenside': bool(self.castling & CASTLE_BQ)}}
+
+    @property
+    def grid(self):
+        # Vue objet 8x8 reconstruite à la demande (affichage, compatibilité avec Piece.get_legal_moves)
+        grid = np.empty((8,8), dtype=object)
+        for sq in range(64):
+            if self.squares[sq] >= 0:
+                grid[sq // 8][sq % 8] = self.get_piece(SQUARE_COORDS[sq])
+        return grid
 
     def get_piece(self, position):
         x, y = position
-        return self.grid[x][y]
+        index = self.squares[x*8 + y]
+        if index < 0:
+            return None
+        color, ptype = divmod(index, 6)
+        return PIECE_CLASSES[ptype](COLORS[color], PIECE_TYPES[ptype])
+
+    def king_square(self, color):
+        return lsb(self.pieces[color*6 + KING])
+
+    def is_square_attacked(self, sq, by, occupied=None, mask=FULL_BB):
+        # `mask` retire des pièces attaquantes (pièce capturée lors d'un test de légalité)
+        if occupied is None:
+            occupied = self.occupancy[0] | self.occupancy[1]
+        pieces = self.pieces
+        base = by * 6
+        if KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT] & mask:
+            return True
+        if PAWN_ATTACKS[1 - by][sq] & pieces[base + PAWN] & mask:
+            return True
+        if KING_ATTACKS[sq] & pieces[base + KING]:
+            return True
+        queens = pieces[base + QUEEN]
+        rooks = (pieces[base + ROOK] | queens) & mask
+        if rooks and rook_attacks(sq, occupied) & rooks:
+            return True
+        bishops = (pieces[base + BISHOP] | queens) & mask
+        if bishops and bishop_attacks(sq, occupied) & bishops:
+            return True
+        return False
+
+    def get_legal_moves(self):
+        us = self.turn
+        them = 1 - us
+        own = self.occupancy[us]
+        occupied = own | self.occupancy[them]
+        enemy = self.occupancy[them]
+        pieces = self.pieces
+        base = us * 6
+        king_sq = lsb(pieces[base + KING])
+        in_check = self.is_square_attacked(king_sq, them, occupied)
+        pin_lines = QUEEN_LINES[king_sq]
+        moves = []
 
-    def apply_move(self, move):
-        start, end = move
-        piece = self.grid[start[0]][start[1]]
+        def add(frm, to, ep_capture=-1):
+            # Un coup qui ne part pas d'une ligne du roi ne peut pas exposer le roi
+            if in_check or ep_capture >= 0 or (pin_lines >> frm) & 1:
+                occ = (occupied & ~(1 << frm)) | (1 << to)
+                mask = ~(1 << to)
+                if ep_capture >= 0:
+                    occ &= ~(1 << ep_capture)
+                    mask &= ~(1 << ep_capture)
+                if self.is_square_attacked(king_sq, them, occ, mask):
+                    return False
+            return True
+
+        # Pions
+        forward = -8 if us == WHITE else 8
+        start_row = 6 if us == WHITE else 1
+        last_row = 0 if us == WHITE else 7
+        bb = pieces[base + PAWN]
+        while bb:
+            frm = lsb(bb)
+            bb &= bb - 1
+            row = frm >> 3
+            targets = []
+            to = frm + forward
+            if not (occupied >> to) & 1:
+                targets.append(to)
+                if row == start_row and not (occupied >> (to + forward)) & 1:
+                    targets.append(to + forward)
+            attacks = PAWN_ATTACKS[us][frm]
+            captures = attacks & enemy
+            while captures:
+                targets.append(lsb(captures))
+                captures &= captures - 1
+            for to in targets:
+                if add(frm, to):
+                    if to >> 3 == last_row:
+                        for name in PROMOTION_PIECES:
+                            moves.append((SQUARE_COORDS[frm], SQUARE_COORDS[to], name))
+                    else:
+                        moves.append((SQUARE_COORDS[frm], SQUARE_COORDS[to]))
+            if self.ep_square >= 0 and (attacks >> self.ep_square) & 1:
+                if add(frm, self.ep_square, self.ep_square - forward):
+                    moves.append((SQUARE_COORDS[frm], SQUARE_COORDS[self.ep_square]))
+
+        # Cavaliers, fous, tours, dames
+        for ptype in (KNIGHT, BISHOP, ROOK, QUEEN):
+            bb = pieces[base + ptype]
+            while bb:
+                frm = lsb(bb)
+                bb &= bb - 1
+                if ptype == KNIGHT:
+                    targets = KNIGHT_ATTACKS[frm]
+                elif ptype == BISHOP:
+                    targets = bishop_attacks(frm, occupied)
+                elif ptype == ROOK:
+                    targets = rook_attacks(frm, occupied)
+                else:
+                    targets = rook_attacks(frm, occupied) | bishop_attacks(frm, occupied)
+                targets &= ~own
+                while targets:
+                    to = lsb(targets)
+                    targets &= targets - 1
+                    if add(frm, to):
+                        moves.append((SQUARE_COORDS[frm], SQUARE_COORDS[to]))
+
+        # Roi : la case d'arrivée doit être sûre une fois le roi déplacé
+        targets = KING_ATTACKS[king_sq] & ~own
+        occ_without_king = occupied & ~(1 << king_sq)
+        while targets:
+            to = lsb(targets)
+            targets &= targets - 1
+            if not self.is_square_attacked(to, them, occ_without_king | (1 << to), ~(1 << to)):
+                moves.append((SQUARE_COORDS[king_sq], SQUARE_COORDS[to]))
+
+        # Roque
+        if not in_check:
+            for right, k_from, k_to, _, _, empty, safe in CASTLING_MOVES[us]:
+                if self.castling & right and not occupied & empty and \
+                        not any(self.is_square_attacked(sq, them, occupied) for sq in safe[1:]):
+                    moves.append((SQUARE_COORDS[k_from], SQUARE_COORDS[k_to]))
 
-        # Save state
-        self.history.append({
-            'grid': copy.deepcopy(self.grid),
-            'castling': copy.deepcopy(self.castling_rights),
-            'en_passant': self.en_passant
-        })
+        return moves
 
-        # Handle special moves
-        self._handle_castling(move, piece)
-        self._handle_en_passant(move, piece)
-        self._handle_promotion(end, piece)
+    def apply_move(self, move):
+        start, end = move[0], move[1]
+        frm = start[0]*8 + start[1]
+        to = end[0]*8 + end[1]
+        index = self.squares[frm]
+        if index < 0:
+            raise ValueError(f"Aucune pièce sur la case de départ {start}")
+        color, ptype = divmod(index, 6)
+        captured_sq = self._handle_en_passant(to, color, ptype)
+        captured = self.squares[captured_sq]
+
+        # Save state : enregistrement compact, restauré en O(1) par undo_move
+        self.history.append((frm, to, index, captured, captured_sq,
+                             self.castling, self.ep_square, self.halfmove_clock, self.hash))
 
-        # Update castling rights
-        if piece.name == 'king':
-            self.castling_rights[piece.color] = {'kingside': False, 'queenside': False}
-        elif piece.name == 'rook':
-            if start == (7,0) or start == (0,0):
-                self.castling_rights[piece.color]['queenside'] = False
-            elif start == (7,7) or start == (0,7):
-                self.castling_rights[piece.color]['kingside'] = False
+        # Handle special moves
+        if captured >= 0:
+            self._remove(captured_sq)
+        self._handle_castling(frm, to, color, ptype)
 
         # Execute move
-        self.grid[end[0]][end[1]] = piece
-        self.grid[start[0]][start[1]] = None
-        piece.moved = True
+        self._remove(frm)
+        self._put(index, to)
+        self._handle_promotion(to, color, ptype, move[2] if len(move) > 2 else None)
 
-        # Update en passant
-        self.en_passant = None
-        if piece.name == 'pawn' and abs(start[0] - end[0]) == 2:
-            self.en_passant = ((start[0] + end[0])//2, start[1])
+        # Update castling rights
+        self.hash ^= ZOBRIST_CASTLING[self.castling]
+        self.castling &= CASTLE_MASKS[frm] & CASTLE_MASKS[to]
+        self.hash ^= ZOBRIST_CASTLING[self.castling]
 
+        # Update en passant
+        if self.ep_square >= 0:
+            self.hash ^= ZOBRIST_EN_PASSANT[self.ep_square]
+        self.ep_square = -1
+        if ptype == PAWN and abs(frm - to) == 16:
+            # Case retenue seulement si un pion adverse peut prendre : les transpositions restent identiques
+            ep_square = (frm + to) // 2
+            if PAWN_ATTACKS[color][ep_square] & self.pieces[(1 - color)*6 + PAWN]:
+                self.ep_square = ep_square
+                self.hash ^= ZOBRIST_EN_PASSANT[ep_square]
+
+        self.halfmove_clock = 0 if ptype == PAWN or captured >= 0 else self.halfmove_clock + 1
         self.current_player = 'black' if self.current_player == 'white' else 'white'
-
-    def _handle_castling(self, move, piece):
-        # Implementation for castling moves
-        pass
-
-    def _handle_en_passant(self, move, piece):
-        # Implementation for en passant
-        pass
-
-    def _handle_promotion(self, position, piece):
-        # Handle pawn promotion
-        pass
-
-    def is_check(self, color):
-        # Check detection logic
-        pass
-
-    def is_checkmate(self, color):
-        # Checkmate detection
-        pass
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE
+
+    def undo_move(self):
+        frm, to, index, captured, captured_sq, castling, ep_square, halfmove_clock, key = self.history.pop()
+        color, ptype = divmod(index, 6)
+        self.current_player = COLORS[color]
+
+        # La pièce d'origine (le pion en cas de promotion) retourne sur sa case de départ
+        self._remove(to)
+        self._put(index, frm)
+        if ptype == KING and abs(frm - to) == 2:
+            for _, k_from, k_to, r_from, r_to, _, _ in CASTLING_MOVES[color]:
+                if k_from == frm and k_to == to:
+                    self._put(self._remove(r_to), r_from)
+        if captured >= 0:
+            self._put(captured, captured_sq)
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.hash = key
+
+    def _handle_castling(self, frm, to, color, ptype):
+        # Le roi se déplace de deux colonnes : on déplace aussi la tour
+        if ptype == KING and abs(frm - to) == 2:
+            for _, k_from, k_to, r_from, r_to, _, _ in CASTLING_MOVES[color]:
+                if k_from == frm and k_to == to:
+                    self._put(self._remove(r_from), r_to)
+
+    def _handle_en_passant(self, to, color, ptype):
+        # Case de la pièce capturée : en passant, le pion pris n'est pas sur la case d'arrivée
+        if ptype == PAWN and to == self.ep_square:
+            return to + (8 if color == WHITE else -8)
+        return to
+
+    def _handle_promotion(self, sq, color, ptype, promotion):
+        # Handle pawn promotion (dame par défaut)
+        if ptype == PAWN and sq >> 3 in (0, 7):
+            self._remove(sq)
+            self._put(color*6 + PROMOTION_TYPES[promotion or 'queen'], sq)
+
+    def is_check(self, color=None):
+        color = self.turn if color is None else COLORS.index(color)
+        return self.is_square_attacked(self.king_square(color), 1 - color)
+
+    def is_checkmate(self, color=None):
+        if color is not None and color != self.current_player:
+            return False
+        return self.is_check() and not self.get_legal_moves()
+
+    def is_stalemate(self):
+        return not self.is_check() and not self.get_legal_moves()
+
+    def is_terminal(self):
+        return self.halfmove_clock >= 100 or not self.get_legal_moves()
+
+    def compact(self):
+        # Forme compacte de la position pour l'encodage groupé (voir encode_positions)
+        return (self.pieces[:], self.turn, self.castling, self.ep_square, self.halfmove_clock)
+
+    def to_input(self):
+        return torch.from_numpy(encode_compact([self.compact()])[0])
+
+    def terminal_value(self):
+        # Valeur d'une position terminale du point de vue du joueur au trait
+        return -1.0 if self.is_check() and not self.get_legal_moves() else 0.0
 
     def copy(self):
-        return copy.deepcopy(self)
+        board = Board.__new__(Board)
+        board.pieces = self.pieces[:]
+        board.occupancy = self.occupancy[:]
+        board.squares = self.squares[:]
+        board.current_player = self.current_player
+        board.history = self.history[:]
+        board.castling = self.castling
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.hash = self.hash
+        return board
+
+    @classmethod
+    def from_fen(cls, fen):
+        # Position FEN (pièces, trait, roques, en passant, demi-coups) ; historique vide
+        fields = fen.split()
+        board = cls.__new__(cls)
+        board.pieces = [0] * 12
+        board.occupancy = [0, 0]
+        board.squares = [-1] * 64
+        board.history = []
+        board.hash = 0
+        for row, rank in enumerate(fields[0].split('/')):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    color = WHITE if char.isupper() else BLACK
+                    board._put(color*6 + 'pnbrqk'.index(char.lower()), row*8 + col)
+                    col += 1
+        turn = WHITE if len(fields) < 2 or fields[1] == 'w' else BLACK
+        board.current_player = COLORS[turn]
+        rights = fields[2] if len(fields) > 2 else '-'
+        board.castling = sum(right for char, right in zip('KQkq', (CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ))
+                             if char in rights)
+        board.ep_square = -1
+        if len(fields) > 3 and fields[3] != '-':
+            # Même convention que apply_move : case retenue seulement si une prise est possible
+            ep_square = (8 - int(fields[3][1])) * 8 + ord(fields[3][0]) - ord('a')
+            if PAWN_ATTACKS[1 - turn][ep_square] & board.pieces[turn*6 + PAWN]:
+                board.ep_square = ep_square
+                board.hash ^= ZOBRIST_EN_PASSANT[ep_square]
+        board.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        board.hash ^= ZOBRIST_CASTLING[board.castling]
+        if turn == BLACK:
+            board.hash ^= ZOBRIST_BLACK_TO_MOVE
+        return board
 
     def __str__(self):
         s = ''
-        for row in self.grid:
-            s += ' '.join([p.symbol if p else '·' for p in row]) + '\n'
+        for row in range(8):
+            s += ' '.join([self.get_piece((row, col)).symbol if self.squares[row*8 + col] >= 0 else '·'
+                           for col in range(8)]) + '\n'
         return s
 
+"""#Encodage
+Encodage vectorisé des positions en tenseurs d'entrée (N, 20, 8, 8) pour ChessNet.
+
+Plans : 0-11 pièces (pion, cavalier, fou, tour, dame, roi des blancs puis des noirs), 12 trait aux blancs,
+13-16 droits de roque (petit et grand roque des blancs puis des noirs), 17 case de prise en passant,
+18 règle des 50 coups (demi-coups / 100), 19 constante.
+"""
+
+CASTLING_PLANES = np.array([CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ])
+
+def encode_positions(pieces, turns, castling, ep_squares, halfmove_clocks, out=None):
+    # pieces : (N, 12) bitboards ; les autres arguments : (N,). Remplit out (N, 20, 8, 8) sans boucle Python
+    pieces = np.ascontiguousarray(pieces, dtype='<u8').reshape(-1, 12)
+    n = len(pieces)
+    if out is None:
+        out = np.empty((n, 20, 8, 8), dtype=np.float32)
+    planes = out.reshape(n, 20, 64)
+    planes[:, :12] = np.unpackbits(pieces.view(np.uint8).reshape(n, 12, 8), axis=2, bitorder='little')
+    planes[:, 12] = (np.asarray(turns) == WHITE)[:, None]
+    planes[:, 13:17] = ((np.asarray(castling)[:, None] & CASTLING_PLANES) != 0)[:, :, None]
+    planes[:, 17] = 0.0
+    ep_squares = np.asarray(ep_squares)
+    rows = np.nonzero(ep_squares >= 0)[0]
+    planes[rows, 17, ep_squares[rows]] = 1.0
+    planes[:, 18] = (np.asarray(halfmove_clocks, dtype=np.float32) / 100.0)[:, None]
+    planes[:, 19] = 1.0
+    return out
+
+def encode_compact(positions, out=None):
+    # positions : liste de Board.compact()
+    pieces, turns, castling, ep_squares, halfmove_clocks = zip(*positions)
+    return encode_positions(np.array(pieces, dtype='<u8'), turns, castling, ep_squares, halfmove_clocks, out)
+
+def encode_boards(boards, out=None):
+    return encode_compact([board.compact() for board in boards], out)
+
+def encode_after_move(parent_planes, board):
+    # Encodage incrémental : part des plans de la position précédente et applique le dernier coup de board
+    frm, to, index, captured, captured_sq = board.history[-1][:5]
+    planes = parent_planes.clone() if isinstance(parent_planes, torch.Tensor) else parent_planes.copy()
+    flat = planes.reshape(20, 64)
+    flat[index, frm] = 0.0
+    if captured >= 0:
+        flat[captured, captured_sq] = 0.0
+    flat[board.squares[to], to] = 1.0  # pièce promue le cas échéant
+    color, ptype = divmod(index, 6)
+    if ptype == KING and abs(frm - to) == 2:
+        for _, k_from, k_to, r_from, r_to, _, _ in CASTLING_MOVES[color]:
+            if k_from == frm and k_to == to:
+                flat[color*6 + ROOK, r_from] = 0.0
+                flat[color*6 + ROOK, r_to] = 1.0
+    flat[12] = 1.0 if board.turn == WHITE else 0.0
+    for i, right in enumerate(CASTLING_PLANES):
+        flat[13 + i] = 1.0 if board.castling & int(right) else 0.0
+    flat[17] = 0.0
+    if board.ep_square >= 0:
+        flat[17, board.ep_square] = 1.0
+    flat[18] = board.halfmove_clock / 100.0
+    return planes
+
 """# ChessNET
 
  Intégration Réseau de Neurones : PyTorch pour le réseau neuronal
 """
 
+# Profils de taille : nombre de blocs résiduels, canaux de la tour, largeurs des têtes.
+# 'full' est l'architecture d'origine (mêmes paramètres, les poids existants se rechargent tels quels) ;
+# les petits profils servent d'élèves (voir Distillation) pour des recherches rapides à beaucoup de simulations.
+NET_PROFILES = {
+    'full':   dict(blocks=19, channels=256, policy_channels=None, value_channels=1, value_hidden=None),
+    'medium': dict(blocks=10, channels=128, policy_channels=32, value_channels=4, value_hidden=128),
+    'small':  dict(blocks=6, channels=64, policy_channels=32, value_channels=4, value_hidden=64),
+    'tiny':   dict(blocks=3, channels=32, policy_channels=16, value_channels=2, value_hidden=32),
+}
+
 class ChessNet(nn.Module):
-    def __init__(self):
+    def __init__(self, profile='full', **overrides):
         super(ChessNet, self).__init__()
-        self.conv1 = nn.Conv2d(20, 256, 3, padding=1)
-        self.resblocks = nn.ModuleList([ResBlock(256) for _ in range(19)])
-        self.policy_head = PolicyHead(256)
-        self.value_head = ValueHead(256)
+        self.config = dict(NET_PROFILES[profile], **overrides)
+        channels = self.config['channels']
+        self.conv1 = nn.Conv2d(20, channels, 3, padding=1)
+        self.resblocks = nn.ModuleList([ResBlock(channels) for _ in range(self.config['blocks'])])
+        self.policy_head = PolicyHead(channels, self.config['policy_channels'])
+        self.value_head = ValueHead(channels, self.config['value_channels'], self.config['value_hidden'])
 
     def forward(self, x):
         x = torch.relu(self.conv1(x))
@@ -301,6 +781,21 @@ class ChessNet(nn.Module):
         value = self.value_head(x)
         return policy, value
 
+    def predict(self, x):
+        # Inférence sans gradient ; accepte une position (20,8,8) ou un lot (N,20,8,8)
+        single = x.dim() == 3
+        if single:
+            x = x.unsqueeze(0)
+        was_training = self.training
+        self.eval()
+        with torch.no_grad():
+            policy, value = self(x)
+        self.train(was_training)
+        policy, value = policy.numpy(), value.squeeze(1).numpy()
+        if single:
+            return policy[0], float(value[0])
+        return policy, value
+
 class ResBlock(nn.Module):
     def __init__(self, channels):
         super().__init__()
@@ -317,27 +812,342 @@ class ResBlock(nn.Module):
         return torch.relu(x)
 
 class PolicyHead(nn.Module):
-    def __init__(self, channels):
+    def __init__(self, channels, head_channels=None):
         super().__init__()
-        self.conv = nn.Conv2d(channels, 73, 1)
+        # head_channels : réduction 1x1 optionnelle avant les 73 plans de coups
+        if head_channels:
+            self.reduce = nn.Sequential(nn.Conv2d(channels, head_channels, 1), nn.ReLU())
+        else:
+            self.reduce = nn.Identity()
+        self.conv = nn.Conv2d(head_channels or channels, 73, 1)
 
     def forward(self, x):
         batch_size = x.size(0)
-        return self.conv(x).view(batch_size, -1)
+        return self.conv(self.reduce(x)).reshape(batch_size, -1)
+
+# Plans de la politique (73 x 8 x 8, indexée plan*64 + case de départ) :
+# 0-55 déplacements de dame (8 directions x 7 distances), 56-63 sauts de cavalier,
+# 64-72 sous-promotions (3 directions x cavalier/fou/tour). La promotion en dame utilise un plan de dame.
+QUEEN_DIRECTIONS = [(-1,0), (-1,1), (0,1), (1,1), (1,0), (1,-1), (0,-1), (-1,-1)]
+UNDERPROMOTIONS = ('knight', 'bishop', 'rook')
+
+def _policy_tables():
+    # Table bidirectionnelle précalculée : code de coup (voir encode_move) <-> indice de la politique.
+    # Un indice de plan de dame désigne aussi la promotion en dame de la même géométrie ;
+    # POLICY_TO_MOVE donne alors le coup sans promotion, -1 pour les indices qui sortent de l'échiquier.
+    move_to_policy = np.full(5 << 12, -1, dtype=np.int16)
+    policy_to_move = np.full(73 * 64, -1, dtype=np.int32)
+    for plane in range(73):
+        for frm in range(64):
+            row, col = SQUARE_COORDS[frm]
+            promotion = 0
+            if plane < 56:
+                (dx, dy), distance = QUEEN_DIRECTIONS[plane // 7], plane % 7 + 1
+                dx, dy = dx * distance, dy * distance
+            elif plane < 64:
+                dx, dy = KNIGHT_OFFSETS[plane - 56]
+            else:
+                if row not in (1, 6):
+                    continue
+                dx, dy = (-1 if row == 1 else 1), (plane - 64) // 3 - 1
+                promotion = PROMOTION_PIECES.index(UNDERPROMOTIONS[(plane - 64) % 3]) + 1
+            if not (0 <= row + dx < 8 and 0 <= col + dy < 8):
+                continue
+            index = plane * 64 + frm
+            code = frm | ((row + dx) * 8 + col + dy) << 6
+            policy_to_move[index] = code
+            move_to_policy[code | promotion << 12] = index
+            if plane < 56 and distance == 1 and (row, row + dx) in ((1, 0), (6, 7)):
+                move_to_policy[code | 1 << 12] = index  # promotion en dame
+    return move_to_policy, policy_to_move
+
+MOVE_TO_POLICY, POLICY_TO_MOVE = _policy_tables()
+
+def policy_index(move):
+    return int(MOVE_TO_POLICY[encode_move(move)])
+
+def policy_indices(moves):
+    # Indices de la politique d'une liste de coups, par simple lecture de MOVE_TO_POLICY
+    return MOVE_TO_POLICY[np.array([encode_move(move) for move in moves], dtype=np.int64)].astype(np.int64)
+
+def masked_priors(policies, legal_indices):
+    # Décodage d'un lot : softmax de chaque ligne de `policies` (N, 4672) restreint à ses indices légaux.
+    # Une seule lecture groupée des logits, puis max/somme par segment (reduceat) : pas de boucle sur les sorties.
+    counts = np.array([len(indices) for indices in legal_indices], dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    if counts.sum() == 0:
+        return [np.zeros(0, dtype=np.float32) for _ in legal_indices]
+    rows = np.repeat(np.arange(len(counts)), counts)
+    logits = np.asarray(policies, dtype=np.float32)[rows, np.concatenate(legal_indices)]
+    present = counts > 0
+    logits -= np.repeat(np.maximum.reduceat(logits, starts[present]), counts[present])
+    priors = np.exp(logits)
+    priors /= np.repeat(np.add.reduceat(priors, starts[present]), counts[present])
+    return np.split(priors, starts[1:])
+
+def legal_priors(policy, moves):
+    # Softmax des logits de la politique restreint aux coups légaux ; uniforme sans politique
+    if policy is None:
+        return np.full(len(moves), 1.0 / max(len(moves), 1), dtype=np.float32)
+    return masked_priors(np.asarray(policy)[None], [policy_indices(moves)])[0]
 
 class ValueHead(nn.Module):
-    def __init__(self, channels):
+    def __init__(self, channels, head_channels=1, hidden=None):
         super().__init__()
-        self.conv = nn.Conv2d(channels, 1, 1)
-        self.fc = nn.Linear(8*8, 1)
+        self.conv = nn.Conv2d(channels, head_channels, 1)
+        # hidden : couche cachée optionnelle entre les plans de la tête et la valeur
+        if hidden:
+            self.fc = nn.Sequential(nn.Linear(head_channels*8*8, hidden), nn.ReLU(), nn.Linear(hidden, 1))
+        else:
+            self.fc = nn.Linear(head_channels*8*8, 1)
         self.tanh = nn.Tanh()
 
     def forward(self, x):
         x = torch.relu(self.conv(x))
-        x = x.view(x.size(0), -1)
+        x = x.reshape(x.size(0), -1)
         x = self.fc(x)
         return self.tanh(x)
 
+"""#InferenceNet
+Export de ChessNet pour l'inférence : chaque BatchNorm est replié dans la convolution qui la précède,
+le graphe est figé avec TorchScript (torch.jit.freeze) et les activations sont en channels-last.
+
+export_inference produit un InferenceModel (même interface predict que ChessNet) et peut l'enregistrer ;
+InferenceModel.load recharge l'artefact sans la classe d'entraînement. Engine et ChessRL l'acceptent
+à la place du module d'entraînement.
+"""
+
+def fold_batchnorm(conv, bn):
+    # Convolution équivalente à bn(conv(x)) en mode évaluation
+    scale = bn.weight.detach() / torch.sqrt(bn.running_var + bn.eps)
+    bias = conv.bias.detach() if conv.bias is not None else torch.zeros_like(bn.running_mean)
+    folded = nn.Conv2d(conv.in_channels, conv.out_channels, conv.kernel_size, stride=conv.stride,
+                       padding=conv.padding, bias=True)
+    with torch.no_grad():
+        folded.weight.copy_(conv.weight.detach() * scale.view(-1, 1, 1, 1))
+        folded.bias.copy_((bias - bn.running_mean) * scale + bn.bias.detach())
+    return folded
+
+class FoldedResBlock(nn.Module):
+    def __init__(self, block):
+        super().__init__()
+        self.conv1 = fold_batchnorm(block.conv1, block.bn1)
+        self.conv2 = fold_batchnorm(block.conv2, block.bn2)
+
+    def forward(self, x):
+        return torch.relu(self.conv2(torch.relu(self.conv1(x))) + x)
+
+class InferenceNet(nn.Module):
+    # ChessNet sans BatchNorm dans la tour ; les têtes (sans BN) sont reprises telles quelles
+    def __init__(self, model):
+        super().__init__()
+        self.conv1 = copy.deepcopy(model.conv1)
+        self.resblocks = nn.ModuleList([FoldedResBlock(block) for block in model.resblocks])
+        self.policy_head = copy.deepcopy(model.policy_head)
+        self.value_head = copy.deepcopy(model.value_head)
+
+    def forward(self, x):
+        x = torch.relu(self.conv1(x))
+        for block in self.resblocks:
+            x = block(x)
+        return self.policy_head(x), self.value_head(x)
+
+class InferenceModel:
+    def __init__(self, module, autocast=None):
+        self.module = module
+        self.autocast = autocast  # None ou torch.bfloat16 (voir quantize_inference)
+
+    def predict(self, x):
+        # Même contrat que ChessNet.predict : une position (20,8,8) ou un lot (N,20,8,8)
+        single = x.dim() == 3
+        if single:
+            x = x.unsqueeze(0)
+        with torch.inference_mode(), torch.autocast('cpu', dtype=self.autocast or torch.bfloat16,
+                                                    enabled=self.autocast is not None):
+            policy, value = self.module(x.contiguous(memory_format=torch.channels_last))
+        policy, value = policy.float().numpy(), value.float().squeeze(1).numpy()
+        if single:
+            return policy[0], float(value[0])
+        return policy, value
+
+    def save(self, path):
+        torch.jit.save(self.module, path, _extra_files={'autocast': str(self.autocast or '')})
+
+    @classmethod
+    def load(cls, path):
+        extra_files = {'autocast': ''}
+        module = torch.jit.load(path, _extra_files=extra_files)
+        autocast = extra_files['autocast']
+        autocast = autocast.decode() if isinstance(autocast, bytes) else autocast
+        return cls(module, torch.bfloat16 if autocast == str(torch.bfloat16) else None)
+
+def export_inference(model, path=None, compile=False):
+    # Repli BN + channels-last, puis TorchScript figé (ou torch.compile, non sérialisable, si compile=True)
+    net = InferenceNet(model).eval().to(memory_format=torch.channels_last)
+    for parameter in net.parameters():
+        parameter.requires_grad_(False)
+    if compile and hasattr(torch, 'compile'):
+        return InferenceModel(torch.compile(net))
+    exported = InferenceModel(torch.jit.freeze(torch.jit.script(net)))
+    if path is not None:
+        exported.save(path)
+    return exported
+
+def benchmark_inference(model, exported=None, batch_sizes=(1, 8, 64), seconds=2.0):
+    # Évaluations par seconde sur CPU : module d'entraînement (predict) contre modèle exporté
+    exported = exported or export_inference(model)
+    results = {}
+    for size in batch_sizes:
+        x = torch.from_numpy(encode_boards([Board()] * size))
+        for name, candidate in (('ChessNet', model), ('export', exported)):
+            candidate.predict(x)  # préchauffage
+            calls = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                candidate.predict(x)
+                calls += 1
+            results[name, size] = calls * size / (time.perf_counter() - start)
+        print(f"batch={size:3d} : ChessNet {results['ChessNet', size]:9.1f} éval/s, "
+              f"export {results['export', size]:9.1f} éval/s (x{results['export', size] / results['ChessNet', size]:.2f})")
+    return results
+
+"""#Quantization
+Modes d'inférence réduits pour l'auto-jeu sur CPU, choisis par le paramètre `precision` d'Engine :
+'fp32' (module tel quel), 'bf16' (export_inference sous autocast bfloat16) ou 'int8'.
+
+Le mode 'int8' quantifie statiquement (FX, poids et activations) toutes les convolutions et ValueHead.fc
+du modèle replié ; les plages d'activation sont calibrées sur des positions de la mémoire de rejeu
+(ou, à défaut, de parties aléatoires). quantization_report mesure l'écart au modèle fp32.
+"""
+
+PRECISIONS = ('fp32', 'bf16', 'int8')
+
+def random_positions(count, max_plies=80, seed=None):
+    # Positions encodées tirées de parties aléatoires, pour calibrer sans mémoire de rejeu
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = Board()
+        for _ in range(rng.randrange(max_plies)):
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.apply_move(rng.choice(moves))
+        boards.append(board)
+    return torch.from_numpy(encode_boards(boards))
+
+def quantize_inference(model, precision='int8', calibration=None, path=None, batch_size=64):
+    # Modèle d'inférence réduit (InferenceModel) ; calibration : positions encodées (N,20,8,8)
+    if precision == 'fp32':
+        return export_inference(model, path)
+    if precision == 'bf16':
+        exported = export_inference(model)
+        if torch.amp.is_autocast_available('cpu'):
+            exported.autocast = torch.bfloat16
+    elif precision == 'int8':
+        from torch.ao.quantization import get_default_qconfig_mapping
+        from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+        if calibration is None:
+            calibration = random_positions(256)
+        engines = torch.backends.quantized.supported_engines
+        backend = next(name for name in ('x86', 'fbgemm', 'qnnpack') if name in engines)
+        torch.backends.quantized.engine = backend
+        prepared = prepare_fx(InferenceNet(model).eval(), get_default_qconfig_mapping(backend), (calibration[:1],))
+        with torch.no_grad():
+            for start in range(0, len(calibration), batch_size):
+                prepared(calibration[start:start + batch_size])
+        quantized = convert_fx(prepared)
+        exported = InferenceModel(torch.jit.freeze(torch.jit.trace(quantized, (calibration[:1],))))
+    else:
+        raise ValueError(f"précision inconnue : {precision} (attendu : {', '.join(PRECISIONS)})")
+    if path is not None:
+        exported.save(path)
+    return exported
+
+def quantization_report(reference, candidate, states):
+    # KL(politique fp32 || politique réduite) et MSE des valeurs sur les positions `states`
+    ref_policy, ref_value = reference.predict(states)
+    policy, value = candidate.predict(states)
+    ref_log = torch.log_softmax(torch.from_numpy(ref_policy), dim=1)
+    log = torch.log_softmax(torch.from_numpy(policy), dim=1)
+    report = {
+        'policy_kl': float((ref_log.exp() * (ref_log - log)).sum(dim=1).mean()),
+        'value_mse': float(np.mean((ref_value - value) ** 2)),
+        'top1_agreement': float(np.mean(ref_policy.argmax(axis=1) == policy.argmax(axis=1))),
+    }
+    print(f"KL politique {report['policy_kl']:.5f}, MSE valeur {report['value_mse']:.6f}, "
+          f"meilleur coup identique {100.0 * report['top1_agreement']:.1f} %")
+    return report
+
+"""#EvalCache
+Cache LRU borné des évaluations de ChessNet, indexé par la clé de Zobrist de la position.
+
+Chaque entrée contient les priors sur les coups légaux (dans l'ordre de Board.get_legal_moves) et la valeur.
+Le cache peut être borné en nombre d'entrées et/ou en octets, et sauvegardé sur disque entre deux exécutions.
+"""
+
+class EvalCache:
+    ENTRY_OVERHEAD = 128  # estimation du coût en octets d'une entrée hors tableau des priors
+
+    def __init__(self, max_entries=100000, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, priors, value):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        priors = np.asarray(priors, dtype=np.float32)
+        self.entries[key] = (priors, float(value))
+        self.nbytes += priors.nbytes + self.ENTRY_OVERHEAD
+        # Éviction des entrées les moins récemment utilisées
+        while self.entries and ((self.max_entries is not None and len(self.entries) > self.max_entries) or
+                                (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (old_priors, _) = self.entries.popitem(last=False)
+            self.nbytes -= old_priors.nbytes + self.ENTRY_OVERHEAD
+
+    def clear(self):
+        # À appeler quand les poids du réseau changent
+        self.entries.clear()
+        self.nbytes = 0
+
+    def save(self, path, tag=None):
+        # tag : identifiant des poids (chemin du modèle...) ; un cache d'autres poids est ignoré au chargement
+        with open(path, 'wb') as f:
+            pickle.dump({'tag': tag, 'entries': list(self.entries.items())}, f)
+
+    def load(self, path, tag=None):
+        if not os.path.exists(path):
+            return False
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data['tag'] != tag:
+            return False
+        for key, (priors, value) in data['entries']:
+            self.put(key, priors, value)
+        return True
+
 """#Engine
  Engine (Moteur de jeu de l'IA basé sur l'algorithme MCTS d'apprentissage par renforcement)
 
@@ -347,121 +1157,1170 @@ class ValueHead(nn.Module):
 """
 
 class Engine:
-    def __init__(self, model, simulations=800):
+    def __init__(self, model, simulations=800, use_transpositions=True, batch_size=1, virtual_loss=1.0,
+                 memory_budget=None, selection='puct', c_puct=1.5, fpu_reduction=0.25, reuse_tree=True,
+                 cache=None, server=None, precision='fp32', calibration=None, movetime=None, early_stop=True):
+        # precision 'bf16' / 'int8' : le module est remplacé par sa version réduite (voir quantize_inference)
+        if precision != 'fp32' and isinstance(model, nn.Module):
+            model = quantize_inference(model, precision, calibration)
+        self.precision = precision
         self.model = model
         self.simulations = simulations
-
-    def search(self, board):
-        root = Node(board.copy())
-
-        for _ in range(self.simulations):
-            node = root
-            state = board.copy()
-
-            # Selection
-            while not node.is_leaf():
-                node = node.select_child()
-                state.apply_move(node.move)
-
-            # Expansion
-            if not state.is_terminal():
-                policy, value = self.model.predict(state.to_input())
-                node.expand(state.get_legal_moves(), policy)
+        # Mode client : les évaluations passent par un InferenceServer partagé (voir search_async)
+        self.server = server
+        # Cache optionnel (EvalCache) consulté avant chaque appel au réseau
+        self.cache = cache
+        self._inputs = np.empty((batch_size, 20, 8, 8), dtype=np.float32)  # tampon d'encodage réutilisé
+        # Réutilisation de l'arbre d'un coup à l'autre : la position retrouvée devient la nouvelle racine
+        self.reuse_tree = reuse_tree
+        self.root = None
+        # Sélection 'puct' (priors du réseau) ou 'ucb' (UCB1 sans priors)
+        self.selection = selection
+        self.c_puct = c_puct
+        self.fpu_reduction = fpu_reduction
+        # Arbre stocké dans un TreeStore ; memory_budget (octets) borne la taille de ses tableaux
+        self.memory_budget = memory_budget
+        self.tree = None
+        # Table de transposition : clé de Zobrist -> index de nœud, l'arbre devient un graphe (DAG)
+        self.use_transpositions = use_transpositions
+        self.transpositions = {}
+        # Feuilles collectées par évaluation groupée du réseau ; la perte virtuelle fait diverger les descentes
+        self.batch_size = batch_size
+        self.virtual_loss = virtual_loss
+        # Budget par coup : movetime (secondes) remplace `simulations` comme limite par défaut ;
+        # early_stop arrête la recherche dès que le coup le plus visité ne peut plus être rattrapé
+        self.movetime = movetime
+        self.early_stop = early_stop
+        self.nodes_per_second = 0.0
+        self.stop_reason = None  # 'nodes', 'time', 'early', 'memory', 'stopped' ou 'terminal' pour la dernière recherche
+        # Réflexion pendant le tour de l'adversaire (voir start_pondering) : thread de recherche et signal d'arrêt
+        self.stop_event = threading.Event()
+        self.ponder_thread = None
+
+    def _new_tree(self):
+        return TreeStore(max_bytes=self.memory_budget, use_transpositions=self.use_transpositions,
+                         c_puct=self.c_puct if self.selection == 'puct' else None,
+                         fpu_reduction=self.fpu_reduction)
+
+    def _reuse_root(self, board):
+        # Cherche la position parmi les enfants et petits-enfants de la racine précédente
+        # (notre coup puis la réponse adverse) ; seul son sous-arbre est conservé, le reste est libéré
+        if not self.reuse_tree or self.root is None:
+            return None
+        index = self.tree.find(board.hash, self.root.index, max_depth=2)
+        if index < 0:
+            return None
+        self.tree = self.tree.extract(index, self._new_tree())
+        self.tree.states[0] = board.copy()
+        return Node(self.tree, 0)
+
+    def search(self, board, movetime=None, nodes=None, deadline=None, ponder=False):
+        # Limites du coup (la première atteinte arrête la recherche) : movetime en secondes, nodes en simulations,
+        # deadline en valeur de time.perf_counter() ; sans limite de temps, nodes vaut self.simulations.
+        # ponder : réflexion sans limite de temps ni arrêt anticipé, jusqu'à stop_pondering (ou `nodes`)
+        steps = self._search_steps(board, movetime, nodes, deadline, ponder)
+        try:
+            batch_inputs = next(steps)
+            while True:
+                batch_inputs = steps.send(self.model.predict(torch.from_numpy(batch_inputs)))
+        except StopIteration as result:
+            return result.value
+
+    async def search_async(self, board, movetime=None, nodes=None, deadline=None):
+        # Même recherche, mais chaque lot de feuilles est évalué par le serveur d'inférence
+        steps = self._search_steps(board, movetime, nodes, deadline)
+        try:
+            batch_inputs = next(steps)
+            while True:
+                batch_inputs = steps.send(await self.server.evaluate(batch_inputs))
+        except StopIteration as result:
+            return result.value
+
+    def _search_steps(self, board, movetime=None, nodes=None, deadline=None, ponder=False):
+        # Cœur de la recherche : générateur qui cède chaque lot d'entrées encodées
+        # et reçoit en retour (politiques, valeurs) ; renvoie None sur une position terminale
+        if board.is_terminal():
+            self.stop_reason = 'terminal'
+            return None
+        root = self._reuse_root(board)
+        if root is None:
+            self.tree = self._new_tree()
+            root = Node(self.tree, self.tree.add_node(board.hash, state=board.copy()))
+        self.root = root
+        self.transpositions = self.tree.table if self.tree.table is not None else {}
+        state = board.copy()  # un seul échiquier, parcouru vers le bas puis restauré avec undo_move
+        start_time = time.perf_counter()
+        movetime = self.movetime if movetime is None else movetime
+        stop_time = min((limit for limit in (None if movetime is None else start_time + movetime, deadline)
+                         if limit is not None), default=None)
+        early_stop = self.early_stop and not ponder
+        if ponder:
+            stop_time = None  # la réflexion dure jusqu'au coup de l'adversaire
+        elif nodes is None and stop_time is None:
+            nodes = self.simulations
+
+        # Les visites déjà présentes dans un sous-arbre réutilisé comptent dans le budget ; sans limite
+        # de nœuds, seul le temps (ou la mémoire) arrête la recherche
+        budget = None if nodes is None else max(nodes - root.visits, 0 if not root.is_leaf() else 1)
+        self.stop_reason = 'nodes'
+        done = 0
+        while budget is None or done < budget:
+            if self.stop_event.is_set():
+                self.stop_reason = 'stopped'
+                break
+            batch = self.batch_size if budget is None else min(self.batch_size, budget - done)
+            descents = []
+            leaves = {}   # index de la feuille -> (index dans le lot, feuille, coups légaux)
+            inputs = []   # formes compactes des feuilles, encodées d'un bloc
+            memory_full = False
+
+            # Selection : `batch` descentes sous perte virtuelle ; chacune crée au plus un nœud (la feuille)
+            for _ in range(batch):
+                if not self.tree.has_room(1, 0):
+                    memory_full = True
+                    break
+                path, value = self._select_leaf(root, state)
+                slot = None
+                if value is None and path[-1].index not in leaves and self.cache is not None:
+                    value = self._expand_from_cache(path[-1], state)
+                if value is None:
+                    leaf = path[-1]
+                    if leaf.index not in leaves:
+                        leaves[leaf.index] = (len(inputs), leaf, state.get_legal_moves())
+                        inputs.append(state.compact())
+                    slot = leaves[leaf.index][0]
+                descents.append((path, value, slot))
+                for _ in range(len(path) - 1):
+                    state.undo_move()
+
+            # Budget mémoire atteint : on annule les descentes en cours et on arrête la recherche
+            # (les feuilles sont déjà des nœuds de l'arbre : seules leurs arêtes restent à réserver)
+            new_edges = sum(len(moves) for _, _, moves in leaves.values())
+            if not descents or not self.tree.has_room(0, new_edges):
+                for path, _, _ in descents:
+                    for node in path:
+                        node.revert_virtual_loss(self.virtual_loss)
+                self.stop_reason = 'memory'
+                break
+
+            # Expansion : une seule passe du réseau pour tout le lot
+            if inputs:
+                if len(self._inputs) < len(inputs):
+                    self._inputs = np.empty((len(inputs), 20, 8, 8), dtype=np.float32)
+                policies, values = yield encode_compact(inputs, self._inputs[:len(inputs)])
+                # Les feuilles sont dans l'ordre de leurs slots : priors décodés d'un bloc pour tout le lot
+                if policies is None:
+                    batch_priors = [legal_priors(None, moves) for _, _, moves in leaves.values()]
+                else:
+                    batch_priors = masked_priors(policies, [policy_indices(moves) for _, _, moves in leaves.values()])
+                for (slot, leaf, moves), priors in zip(leaves.values(), batch_priors):
+                    leaf.expand(moves, priors=priors)
+                    if self.cache is not None:
+                        self.cache.put(leaf.key, priors, values[slot])
 
             # Backpropagation
-            while node is not None:
-                node.update(value)
-                node = node.parent
-                value = -value  # Switch perspective
-
-        return root.best_child(0).move
+            for path, value, slot in descents:
+                self._backup(path, float(values[slot]) if value is None else value)
+            done += len(descents)
+            if memory_full:
+                self.stop_reason = 'memory'
+                break
+
+            # Limites vérifiées une fois par lot : horloge, puis arrêt anticipé sur les simulations restantes
+            if stop_time is None and not early_stop:
+                continue
+            now = time.perf_counter()
+            if stop_time is not None and now >= stop_time:
+                self.stop_reason = 'time'
+                break
+            remaining = None if budget is None else budget - done
+            if stop_time is not None:
+                # Simulations encore possibles au débit observé
+                expected = int((stop_time - now) * done / (now - start_time)) + 1
+                remaining = expected if remaining is None else min(remaining, expected)
+            if early_stop and self._decided(root, remaining):
+                self.stop_reason = 'early'
+                break
+
+        elapsed = time.perf_counter() - start_time
+        self.nodes_per_second = done / elapsed if elapsed > 0 else 0.0
+        return root.best_move()
+
+    def start_pondering(self, board, nodes=None):
+        # Réflexion pendant le tour de l'adversaire : recherche depuis `board` dans un thread jusqu'à
+        # stop_pondering (input() et le réseau libèrent le GIL), sans movetime ni arrêt anticipé ; seuls
+        # `nodes` et memory_budget la bornent. La recherche suivante retrouve la position après le coup
+        # adverse parmi les enfants de la racine et repart de son sous-arbre (_reuse_root)
+        self.stop_pondering()
+        if board.is_terminal():
+            return
+        self.ponder_thread = threading.Thread(target=self.search, args=(board.copy(),),
+                                              kwargs=dict(nodes=nodes, ponder=True), daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        # Arrête la réflexion en cours (le lot commencé est terminé) ; sans effet s'il n'y en a pas
+        if self.ponder_thread is None:
+            return
+        self.stop_event.set()
+        self.ponder_thread.join()
+        self.ponder_thread = None
+        self.stop_event.clear()
+
+    def _decided(self, root, remaining):
+        # Arrêt anticipé : même en recevant toutes les simulations restantes, le deuxième coup le plus visité
+        # ne rattraperait pas le premier (best_move) ; un coup unique est joué sans chercher davantage
+        start, end = self.tree.edge_range(root.index)
+        if end - start < 2:
+            return end - start == 1
+        visits, _ = self.tree.edge_stats(start, end)
+        second, first = np.partition(visits, -2)[-2:]
+        return first - second > remaining
+
+    def _select_leaf(self, root, state):
+        # Descend jusqu'à une feuille ; renvoie le chemin et la valeur si la feuille est déjà connue
+        node = root
+        path = [root]
+        seen = {state.hash}
+        root.add_virtual_loss(self.virtual_loss)
+        while not node.is_leaf():
+            # L'enfant n'est créé (ou retrouvé dans la table de transposition) qu'à la première descente
+            edge = node.select_edge()
+            state.apply_move(node.tree.edge_move_at(edge))
+            node = node.child(edge, state.hash)
+            node.add_virtual_loss(self.virtual_loss)
+            path.append(node)
+            if state.hash in seen:
+                return path, 0.0  # position répétée sur le chemin : cycle dans le graphe, comptée nulle
+            seen.add(state.hash)
+        if state.is_terminal():
+            return path, state.terminal_value()
+        return path, None
+
+    def _expand_from_cache(self, leaf, state):
+        # Développe la feuille depuis le cache ; renvoie la valeur, ou None si la position est absente
+        entry = self.cache.get(state.hash)
+        if entry is None:
+            return None
+        priors, value = entry
+        moves = state.get_legal_moves()
+        if len(priors) != len(moves):  # collision de clés : on ignore l'entrée
+            return None
+        if not self.tree.has_room(0, len(moves)):  # le lot s'arrêtera sur le budget mémoire
+            return None
+        leaf.expand(moves, priors=priors)
+        return value
+
+    def visit_distribution(self):
+        # Coups de la racine de la dernière recherche et proportions de visites (cible de politique)
+        start, end = self.tree.edge_range(self.root.index)
+        visits, _ = self.tree.edge_stats(start, end)
+        return self.root.moves, visits / max(visits.sum(), 1.0)
+
+    def _backup(self, path, value):
+        # `value` est vue par le joueur au trait dans la feuille ; chaque nœud stocke la valeur
+        # du point de vue du joueur qui a joué le coup menant à lui (celui qui le choisit)
+        for node in reversed(path):
+            value = -value  # Switch perspective
+            node.revert_virtual_loss(self.virtual_loss)
+            node.update(value)
+
+    def benchmark(self, board, batch_sizes=(1, 4, 8, 16, 32)):
+        # Nœuds par seconde selon la taille de lot, à nombre de simulations égal : chaque mesure part d'un
+        # arbre vide, sans réutilisation, arrêt anticipé ni cache, pour que les tailles restent comparables
+        results = {}
+        saved = (self.batch_size, self.reuse_tree, self.early_stop, self.cache)
+        self.reuse_tree, self.early_stop, self.cache = False, False, None
+        for size in batch_sizes:
+            self.batch_size = size
+            self.root = self.tree = None
+            self.search(board)
+            results[size] = self.nodes_per_second
+            print(f"batch={size:3d} : {self.nodes_per_second:9.1f} nœuds/s")
+        self.batch_size, self.reuse_tree, self.early_stop, self.cache = saved
+        self.root = self.tree = None
+        return results
 
 class Node:
-    def __init__(self, state, parent=None, move=None):
-        self.state = state
-        self.parent = parent
-        self.move = move
-        self.children = []
-        self.visits = 0
-        self.value_sum = 0.0
-        self.prior = 0.0
+    # Vue légère sur un nœud d'un TreeStore : les statistiques vivent dans les tableaux de l'arbre
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def state(self):
+        # Position reconstruite à la demande depuis celle du parent, puis conservée
+        state = self.tree.states.get(self.index)
+        if state is None:
+            state = self.parent.state.copy()
+            state.apply_move(self.move)
+            self.tree.states[self.index] = state
+        return state
+
+    @property
+    def parent(self):
+        parent = self.tree.parent[self.index]
+        return Node(self.tree, int(parent)) if parent >= 0 else None
+
+    @property
+    def move(self):
+        return decode_move(int(self.tree.move[self.index])) if self.tree.parent[self.index] >= 0 else None
+
+    @property
+    def key(self):
+        return int(self.tree.key[self.index])
+
+    @property
+    def visits(self):
+        return int(self.tree.visits[self.index])
+
+    @property
+    def value_sum(self):
+        return float(self.tree.value_sum[self.index])
+
+    @property
+    def prior(self):
+        return float(self.tree.prior[self.index])
+
+    @property
+    def moves(self):
+        # coups des arêtes sortantes, alignés avec self.children
+        start, end = self.tree.edge_range(self.index)
+        return [decode_move(int(code)) for code in self.tree.edge_move[start:end]]
+
+    @property
+    def children(self):
+        # None pour une arête dans laquelle la recherche n'est pas encore descendue
+        start, end = self.tree.edge_range(self.index)
+        return [Node(self.tree, int(child)) if child >= 0 else None for child in self.tree.edge_child[start:end]]
+
+    def select_edge(self):
+        # Score calculé d'un bloc sur toutes les arêtes du nœud ; renvoie l'index de l'arête choisie
+        tree = self.tree
+        start, end = tree.edge_range(self.index)
+        visits, value_sums = tree.edge_stats(start, end)
+        if tree.c_puct is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = value_sums / visits + np.sqrt(math.log(max(self.visits, 1)) / visits)
+            scores[visits == 0] = np.inf
+            return start + int(np.argmax(scores))
+
+        # PUCT : Q + c_puct * P * sqrt(N) / (1 + n)
+        priors = tree.edge_prior[start:end]
+        visited = visits > 0
+        # FPU : un enfant jamais visité reçoit la valeur du parent (vue par le joueur au trait),
+        # diminuée en fonction de la masse de prior déjà explorée
+        parent_q = -self.value_sum / self.visits if self.visits > 0 else 0.0
+        fpu = parent_q - tree.fpu_reduction * math.sqrt(float(priors[visited].sum()))
+        q = np.where(visited, value_sums / np.maximum(visits, 1), fpu)
+        scores = q + tree.c_puct * priors * math.sqrt(max(self.visits, 1)) / (1 + visits)
+        return start + int(np.argmax(scores))
+
+    def child(self, edge, key):
+        # key : clé de Zobrist de la position atteinte par l'arête
+        return Node(self.tree, self.tree.materialize(self.index, edge, key))
 
     def select_child(self):
-        best_score = -float('inf')
-        best_child = None
-
-        for child in self.children:
-            score = child.ucb_score()
-            if score > best_score:
-                best_score = score
-                best_child = child
-
-        return best_child
-
-    def ucb_score(self):
+        edge = self.select_edge()
+        move = self.tree.edge_move_at(edge)
+        if self.tree.edge_child[edge] >= 0:
+            return move, Node(self.tree, int(self.tree.edge_child[edge]))
+        child_state = self.state.copy()
+        child_state.apply_move(move)
+        child = self.child(edge, child_state.hash)
+        self.tree.states[child.index] = child_state
+        return move, child
+
+    def ucb_score(self, parent_visits):
+        # parent_visits : visites du parent par lequel on arrive (un nœud transposé en a plusieurs)
         if self.visits == 0:
             return float('inf')
         return (self.value_sum / self.visits) + \
-               math.sqrt(math.log(self.parent.visits) / self.visits)
+               math.sqrt(math.log(parent_visits) / self.visits)
 
-    def expand(self, moves, policy):
-        for move in moves:
-            child_state = self.state.copy()
-            child_state.apply_move(move)
-            self.children.append(Node(child_state, self, move))
+    def expand(self, moves, policy=None, priors=None):
+        # priors : probabilités déjà calculées pour les coups légaux (cache), sinon tirées de la politique
+        self.tree.expand(self.index, moves, legal_priors(policy, moves) if priors is None else priors)
 
     def update(self, value):
-        self.visits += 1
-        self.value_sum += value
+        self.tree.visits[self.index] += 1
+        self.tree.value_sum[self.index] += value
+
+    def add_virtual_loss(self, loss):
+        # Compte une défaite provisoire pendant que la feuille attend son évaluation
+        self.tree.visits[self.index] += 1
+        self.tree.value_sum[self.index] -= loss
+
+    def revert_virtual_loss(self, loss):
+        self.tree.visits[self.index] -= 1
+        self.tree.value_sum[self.index] += loss
 
     def is_leaf(self):
-        return len(self.children) == 0
+        return self.tree.edge_count[self.index] == 0
+
+    def best_move(self):
+        # Coup le plus visité ; None si le nœud n'a aucun coup (position terminale ou non développée)
+        start, end = self.tree.edge_range(self.index)
+        if start == end:
+            return None
+        visits, _ = self.tree.edge_stats(start, end)
+        return self.tree.edge_move_at(start + int(np.argmax(visits)))
+
+"""#TreeStore
+Arbre MCTS stocké en tableaux NumPy (structure de tableaux), indexés par des identifiants entiers de nœuds.
+
+Les nœuds (visites, somme des valeurs, prior, coup, clé, parent, plage d'arêtes) et les arêtes
+(coup, prior, enfant) vivent dans des tableaux préalloués qui doublent de taille quand ils sont pleins,
+dans la limite d'un budget mémoire optionnel. Aucun objet Python n'est conservé par nœud.
+
+L'expansion n'enregistre que (coup, prior) par arête : le nœud enfant n'est alloué que lorsque la
+sélection descend pour la première fois dans l'arête, et sa position n'est reconstruite que si on la demande.
+"""
+
+def _ranges(starts, counts):
+    # Concatène les intervalles [start, start + count) sans boucle Python
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total)
+
+def encode_move(move):
+    # Coup -> entier : départ (6 bits), arrivée (6 bits), promotion (index dans PROMOTION_PIECES + 1)
+    start, end = move[0], move[1]
+    promotion = PROMOTION_PIECES.index(move[2]) + 1 if len(move) > 2 else 0
+    return (start[0]*8 + start[1]) | (end[0]*8 + end[1]) << 6 | promotion << 12
+
+def decode_move(code):
+    start, end, promotion = SQUARE_COORDS[code & 63], SQUARE_COORDS[(code >> 6) & 63], code >> 12
+    if promotion:
+        return (start, end, PROMOTION_PIECES[promotion - 1])
+    return (start, end)
+
+
+class TreeStore:
+    NODE_FIELDS = (('visits', np.int32), ('value_sum', np.float64), ('prior', np.float32),
+                   ('move', np.int32), ('key', np.uint64), ('parent', np.int32),
+                   ('edge_start', np.int64), ('edge_count', np.int32))
+    EDGE_FIELDS = (('edge_move', np.int32), ('edge_prior', np.float32), ('edge_child', np.int32))
+    NODE_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in NODE_FIELDS)
+    EDGE_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in EDGE_FIELDS)
+    # Coûts estimés (mesurés avec tracemalloc) des structures Python hors tableaux, comptés dans max_bytes :
+    # une entrée de la table de transposition (clé 64 bits -> index) et une position conservée dans `states`
+    TABLE_ENTRY_BYTES = 80
+    STATE_BYTES = 1100
+
+    def __init__(self, capacity=1024, max_bytes=None, use_transpositions=True, c_puct=None, fpu_reduction=0.0):
+        self.max_bytes = max_bytes
+        # Paramètres de sélection : c_puct=None pour UCB1, sinon PUCT
+        self.c_puct = c_puct
+        self.fpu_reduction = fpu_reduction
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.states = {}   # positions matérialisées (la racine, et celles demandées via Node.state)
+        # Table de transposition : clé de Zobrist -> index de nœud
+        self.table = {} if use_transpositions else None
+        # Avec un budget, les capacités initiales en occupent au plus la moitié (un quart chacune)
+        node_capacity = edge_capacity = capacity
+        if max_bytes is not None:
+            node_capacity = max(min(capacity, max_bytes // (4 * self.NODE_BYTES)), 1)
+            edge_capacity = max(min(capacity, max_bytes // (4 * self.EDGE_BYTES)), 1)
+        for name, dtype in self.NODE_FIELDS:
+            setattr(self, name, np.zeros(node_capacity, dtype=dtype))
+        for name, dtype in self.EDGE_FIELDS:
+            setattr(self, name, np.zeros(edge_capacity, dtype=dtype))
+
+    @property
+    def nbytes(self):
+        # Mémoire réservée par les tableaux (capacité, pas seulement les entrées utilisées),
+        # plus l'estimation de la table de transposition et des positions conservées
+        return len(self.visits) * self.NODE_BYTES + len(self.edge_move) * self.EDGE_BYTES + self._python_bytes()
+
+    def _python_bytes(self, new_nodes=0):
+        table = 0 if self.table is None else (len(self.table) + new_nodes) * self.TABLE_ENTRY_BYTES
+        return table + len(self.states) * self.STATE_BYTES
+
+    def has_room(self, new_nodes, new_edges):
+        # Le budget porte sur la mémoire réservée : capacités actuelles, ou agrandies au strict nécessaire,
+        # et entrées de la table de transposition des nouveaux nœuds
+        if self.max_bytes is None:
+            return True
+        nodes = max(len(self.visits), self.num_nodes + new_nodes)
+        edges = max(len(self.edge_move), self.num_edges + new_edges)
+        return nodes * self.NODE_BYTES + edges * self.EDGE_BYTES + self._python_bytes(new_nodes) <= self.max_bytes
+
+    def _reserve(self, fields, used, needed, row_bytes, other_bytes):
+        capacity = len(getattr(self, fields[0][0]))
+        if used + needed <= capacity:
+            return
+        # Croissance géométrique, plafonnée à la moitié de ce qui reste du budget : l'autre moitié
+        # reste disponible pour l'autre groupe de tableaux (nœuds ou arêtes)
+        new_capacity = max(capacity * 2, used + needed)
+        if self.max_bytes is not None:
+            free = self.max_bytes - self._python_bytes() - other_bytes - (used + needed) * row_bytes
+            headroom = free // (2 * row_bytes)
+            new_capacity = min(new_capacity, used + needed + max(headroom, 0))
+        for name, dtype in fields:
+            array = np.zeros(new_capacity, dtype=dtype)
+            array[:used] = getattr(self, name)[:used]
+            setattr(self, name, array)
+
+    def add_node(self, key, parent=-1, move=0, prior=0.0, state=None):
+        self._reserve(self.NODE_FIELDS, self.num_nodes, 1, self.NODE_BYTES, len(self.edge_move) * self.EDGE_BYTES)
+        index = self.num_nodes
+        self.num_nodes += 1
+        self.visits[index] = 0
+        self.value_sum[index] = 0.0
+        self.prior[index] = prior
+        self.move[index] = move
+        self.key[index] = key
+        self.parent[index] = parent
+        self.edge_start[index] = 0
+        self.edge_count[index] = 0
+        if state is not None:
+            self.states[index] = state
+        if self.table is not None:
+            self.table[key] = index
+        return index
+
+    def edge_range(self, index):
+        start = int(self.edge_start[index])
+        return start, start + int(self.edge_count[index])
+
+    def edge_move_at(self, edge):
+        return decode_move(int(self.edge_move[edge]))
+
+    def edge_stats(self, start, end):
+        # Visites et sommes des valeurs des enfants d'une plage d'arêtes (0 pour un enfant non créé)
+        children = self.edge_child[start:end]
+        created = children >= 0
+        safe = np.where(created, children, 0)
+        visits = np.where(created, self.visits[safe], 0).astype(np.float64)
+        value_sums = np.where(created, self.value_sum[safe], 0.0)
+        return visits, value_sums
+
+    def expand(self, index, moves, priors):
+        # Les arêtes d'un nœud occupent une plage contiguë [edge_start, edge_start + edge_count)
+        count = len(moves)
+        self._reserve(self.EDGE_FIELDS, self.num_edges, count, self.EDGE_BYTES, len(self.visits) * self.NODE_BYTES)
+        start = self.num_edges
+        self.num_edges += count
+        self.edge_move[start:start + count] = [encode_move(move) for move in moves]
+        self.edge_prior[start:start + count] = priors
+        self.edge_child[start:start + count] = -1
+        self.edge_start[index] = start
+        self.edge_count[index] = count
+
+    def find(self, key, root, max_depth=2):
+        # Index du nœud de clé `key` à au plus max_depth coups de root, -1 s'il est absent
+        if self.table is not None:
+            return self.table.get(key, -1)
+        frontier = np.array([root])
+        for _ in range(max_depth + 1):
+            match = frontier[self.key[frontier] == np.uint64(key)]
+            if len(match):
+                return int(match[0])
+            children = self.edge_child[_ranges(self.edge_start[frontier], self.edge_count[frontier])]
+            frontier = children[children >= 0]
+        return -1
+
+    def extract(self, root, tree):
+        # Copie compacte dans `tree` du sous-graphe accessible depuis root (root devient le nœud 0)
+        lookup = np.full(self.num_nodes, -1, dtype=np.int64)
+        lookup[root] = 0
+        levels = [np.array([root])]
+        count = 1
+        while len(levels[-1]):
+            frontier = levels[-1]
+            children = self.edge_child[_ranges(self.edge_start[frontier], self.edge_count[frontier])]
+            children = np.unique(children[children >= 0])
+            children = children[lookup[children] < 0]
+            lookup[children] = np.arange(count, count + len(children))
+            count += len(children)
+            levels.append(children)
+        nodes = np.concatenate(levels)
+        edge_counts = self.edge_count[nodes]
+        edges = _ranges(self.edge_start[nodes], edge_counts)
+
+        tree._reserve(tree.NODE_FIELDS, 0, len(nodes), tree.NODE_BYTES, 0)
+        tree._reserve(tree.EDGE_FIELDS, 0, len(edges), tree.EDGE_BYTES, len(tree.visits) * tree.NODE_BYTES)
+        tree.num_nodes, tree.num_edges = len(nodes), len(edges)
+        for name, _ in self.NODE_FIELDS:
+            getattr(tree, name)[:len(nodes)] = getattr(self, name)[nodes]
+        tree.edge_start[:len(nodes)] = np.cumsum(edge_counts) - edge_counts
+        tree.edge_move[:len(edges)] = self.edge_move[edges]
+        tree.edge_prior[:len(edges)] = self.edge_prior[edges]
+        children = self.edge_child[edges]
+        children = np.where(children >= 0, lookup[children], -1)
+        tree.edge_child[:len(edges)] = children
+        # Parent (et coup d'arrivée) repris de la première arête entrante conservée : l'ancien parent
+        # d'un nœud transposé peut être hors du sous-graphe. Ce parent a toujours un index plus petit.
+        owners = np.repeat(np.arange(len(nodes)), edge_counts)
+        created = np.nonzero(children >= 0)[0]
+        kept, first = np.unique(children[created], return_index=True)
+        tree.parent[kept] = owners[created[first]]
+        tree.move[kept] = tree.edge_move[created[first]]
+        tree.parent[0] = -1
+        if tree.table is not None:
+            tree.table.update(zip(tree.key[:len(nodes)].tolist(), range(len(nodes))))
+        return tree
+
+    def materialize(self, index, edge, key):
+        # Crée l'enfant d'une arête à la première descente ; une position transposée réutilise son nœud
+        child = int(self.edge_child[edge])
+        if child < 0:
+            child = self.table.get(key, -1) if self.table is not None else -1
+            if child < 0:
+                child = self.add_node(key, index, int(self.edge_move[edge]), float(self.edge_prior[edge]))
+            self.edge_child[edge] = child
+        return child
+
+"""#ReplayBuffer
+Mémoire de rejeu sur disque (np.memmap) remplaçant la deque de ChessRL.
+
+Chaque position occupe un enregistrement de taille fixe : position compacte (bitboards, trait, roque,
+en passant, demi-coups), politique cible creuse (au plus REPLAY_POLICY_SIZE couples indice/probabilité) et valeur.
+Les enregistrements forment un tampon circulaire ; l'échantillonnage tire directement un tableau d'indices.
+Sans chemin, le tampon est un simple tableau en mémoire ; avec un chemin, il est projeté en mémoire depuis le disque
+et un fichier .meta conserve la position d'écriture pour survivre au redémarrage de l'apprenant.
+"""
+
+REPLAY_POLICY_SIZE = 64
+REPLAY_DTYPE = np.dtype([('pieces', '<u8', 12), ('turn', 'u1'), ('castling', 'u1'), ('ep_square', 'i1'),
+                         ('halfmove_clock', 'u1'), ('policy_index', '<u2', REPLAY_POLICY_SIZE),
+                         ('policy_prob', '<f2', REPLAY_POLICY_SIZE), ('value', '<f4')])
+
+class ReplayBuffer:
+    def __init__(self, path=None, capacity=10000):
+        self.path = path
+        self.capacity = capacity
+        self.size = 0
+        self.position = 0  # prochain enregistrement écrit
+        if path is None:
+            self.records = np.zeros(capacity, dtype=REPLAY_DTYPE)
+        elif os.path.exists(path):
+            with open(path + '.meta') as f:
+                meta = json.load(f)
+            self.capacity, self.size, self.position = meta['capacity'], meta['size'], meta['position']
+            self.records = np.memmap(path, dtype=REPLAY_DTYPE, mode='r+', shape=(self.capacity,))
+        else:
+            self.records = np.memmap(path, dtype=REPLAY_DTYPE, mode='w+', shape=(capacity,))
+            self._save_meta()
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, samples):
+        # samples : (Board, (indices, probabilités), valeur) comme produits par play_game
+        samples = list(samples)
+        if not samples:
+            return
+        records = np.zeros(len(samples), dtype=REPLAY_DTYPE)
+        pieces, turns, castling, ep_squares, halfmove_clocks = zip(*[state.compact() for state, _, _ in samples])
+        records['pieces'] = np.array(pieces, dtype='<u8')
+        records['turn'] = turns
+        records['castling'] = castling
+        records['ep_square'] = ep_squares
+        records['halfmove_clock'] = np.minimum(halfmove_clocks, 255)
+        records['value'] = [float(value) for _, _, value in samples]
+        # Politique creuse : au plus REPLAY_POLICY_SIZE coups (les plus visités), renormalisés ; le reste à 0
+        for record, (_, (indices, probs), _) in zip(records, samples):
+            top = np.argsort(-probs, kind='stable')[:REPLAY_POLICY_SIZE]
+            record['policy_index'][:len(top)] = indices[top]
+            record['policy_prob'][:len(top)] = probs[top] / max(probs[top].sum(), 1e-8)
+
+        # Écriture circulaire
+        indices = (self.position + np.arange(len(records))) % self.capacity
+        self.records[indices] = records
+        self.position = int((self.position + len(records)) % self.capacity)
+        self.size = min(self.size + len(records), self.capacity)
+        self.flush()
+
+    def sample(self, batch_size, rng=np.random):
+        # Tirage vectorisé : un tableau d'indices, une seule lecture groupée des enregistrements
+        records = self.records[rng.randint(0, self.size, size=min(batch_size, self.size))]
+        states = encode_positions(records['pieces'], records['turn'], records['castling'],
+                                  records['ep_square'], records['halfmove_clock'])
+        return (torch.from_numpy(states), torch.from_numpy(records['policy_index'].astype(np.int64)),
+                torch.from_numpy(records['policy_prob'].astype(np.float32)), torch.from_numpy(records['value'].copy()))
+
+    def flush(self):
+        if self.path is not None:
+            self.records.flush()
+            self._save_meta()
+
+    def _save_meta(self):
+        tmp_path = self.path + '.meta.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'capacity': self.capacity, 'size': self.size, 'position': self.position}, f)
+        os.replace(tmp_path, self.path + '.meta')
+
+class BatchPrefetcher:
+    # Chargeur en arrière-plan : des threads tirent et encodent les lots suivants dans une file bornée
+    # pendant que l'optimiseur traite le lot courant (numpy relâche le GIL pendant les copies et l'encodage)
+    def __init__(self, memory, batch_size, num_batches, num_workers=2, depth=4, seed=None):
+        self.memory = memory
+        self.batch_size = batch_size
+        self.batches = queue.Queue(maxsize=depth)
+        self.stop_event = threading.Event()
+        self.remaining = num_batches
+        self.finished = 0
+        self.lock = threading.Lock()
+        self.wait_time = 0.0
+        self.samples = 0
+        self.start_time = None
+        self.workers = [threading.Thread(target=self._fill, args=(None if seed is None else seed + i,), daemon=True)
+                        for i in range(num_workers)]
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __iter__(self):
+        while True:
+            waited = time.perf_counter()
+            batch = self.batches.get()
+            self.wait_time += time.perf_counter() - waited
+            if batch is None:
+                return
+            if isinstance(batch, Exception):
+                raise batch  # erreur d'un worker, relancée dans la boucle d'entraînement
+            self.samples += len(batch[-1])
+            yield batch
+
+    def _fill(self, seed):
+        rng = np.random.RandomState(seed)
+        try:
+            while not self.stop_event.is_set():
+                with self.lock:
+                    if self.remaining <= 0:
+                        break
+                    self.remaining -= 1
+                self._put(self.memory.sample(self.batch_size, rng))
+        except Exception as exc:
+            self._put(exc)
+        finally:
+            with self.lock:
+                # Le dernier worker signale la fin du flux
+                self.finished += 1
+                last = self.finished == len(self.workers)
+            if last:
+                self._put(None)
+
+    def _put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def stop(self):
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join(timeout=5)
+
+    @property
+    def samples_per_second(self):
+        return self.samples / max(time.perf_counter() - self.start_time, 1e-9)
+
+    @property
+    def wait_fraction(self):
+        return self.wait_time / max(time.perf_counter() - self.start_time, 1e-9)
+
+    def report(self):
+        print(f"entraînement : {self.samples_per_second:.0f} échantillons/s, "
+              f"{100.0 * self.wait_fraction:.1f} % du temps en attente des données")
 
 """#ChessRL
 
 Boucle d'Entraînement par Auto-Jeu: Système d'entraînement par renforcement
 """
 
+def replay_loss(pred_policies, pred_values, policy_indices, policy_probs, values):
+    # La tête de politique renvoie des logits, normalisés ici en log-probabilités (logsumexp) ;
+    # la cible est creuse, on ne lit que les indices qu'elle référence
+    log_policies = pred_policies.gather(1, policy_indices) - torch.logsumexp(pred_policies, dim=1, keepdim=True)
+    policy_loss = torch.mean(-torch.sum(policy_probs * log_policies, dim=1))
+    value_loss = torch.mean((values - pred_values.squeeze(1))**2)
+    return policy_loss + value_loss
+
 class ChessRL:
-    def __init__(self, model_path=None):
-        self.model = ChessNet()
+    def __init__(self, model_path=None, replay_path=None, replay_capacity=10000, inference_path=None,
+                 precision='fp32', profile='full'):
+        self.model = ChessNet(profile)
         if model_path:
             self.model.load_state_dict(torch.load(model_path))
-        self.mcts = Engine(self.model)
+        self.cache = EvalCache()
+        # Mémoire de rejeu : sur disque (np.memmap) si replay_path est donné, sinon en mémoire
+        self.memory = ReplayBuffer(replay_path, replay_capacity)
+        # La recherche peut utiliser un artefact exporté (export_inference) au lieu du module d'entraînement
+        # ou, avec precision 'bf16' / 'int8', une version réduite calibrée sur la mémoire de rejeu
+        if inference_path and precision != 'fp32':
+            raise ValueError("precision s'applique au module d'entraînement, pas à un artefact exporté "
+                             "(inference_path) : utiliser quantize_inference(..., path=...) pour en exporter un")
+        search_model = InferenceModel.load(inference_path) if inference_path else self.model
+        self.precision = precision
+        calibration = self.calibration_positions() if precision != 'fp32' else None
+        self.mcts = Engine(search_model, cache=self.cache, precision=precision, calibration=calibration)
         self.optimizer = optim.Adam(self.model.parameters(), lr=0.001)
-        self.memory = deque(maxlen=10000)
+        self.samples_per_second = 0.0
+        self.data_wait_fraction = 0.0
 
     def get_move(self, board):
         return self.mcts.search(board)
 
-    def train(self, epochs=10, batch_size=32):
-        for epoch in range(epochs):
-            batch = random.sample(self.memory, min(batch_size, len(self.memory)))
-            states, policies, values = zip(*batch)
+    def train(self, epochs=10, batch_size=32, num_workers=2, prefetch=4, verbose=False):
+        # Les lots sont préparés en arrière-plan (BatchPrefetcher) pendant la passe avant/arrière
+        with BatchPrefetcher(self.memory, batch_size, epochs, num_workers=num_workers, depth=prefetch) as loader:
+            for states, policy_indices, policy_probs, values in loader:
+                self._train_step(states, policy_indices, policy_probs, values)
+        self.samples_per_second = loader.samples_per_second
+        self.data_wait_fraction = loader.wait_fraction
+        if verbose:
+            loader.report()
+
+        # Les évaluations en cache proviennent des anciens poids
+        self.cache.clear()
+        if isinstance(self.mcts.model, InferenceModel):
+            self.mcts.model = quantize_inference(self.model, self.precision, self.calibration_positions())
+
+    def calibration_positions(self, count=256):
+        return self.memory.sample(count)[0] if len(self.memory) else None
+
+    def export(self, path):
+        # Artefact d'inférence des poids courants, rechargeable avec ChessRL(inference_path=...)
+        return export_inference(self.model, path)
+
+    def distill(self, profile='small', steps=1000, batch_size=64, **options):
+        # Élève de profil réduit entraîné sur les sorties du réseau courant (le maître)
+        student = ChessNet(profile)
+        Distillation(self.model, student, self.memory, **options).train(steps, batch_size)
+        return student
+
+    def _train_step(self, states, policy_indices, policy_probs, values):
+        # Forward pass
+        pred_policies, pred_values = self.model(states)
+
+        # Calculate loss
+        loss = replay_loss(pred_policies, pred_values, policy_indices, policy_probs, values)
+
+        # Backward pass
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
 
-            # Convert to tensors
-            states = torch.stack([self._board_to_tensor(s) for s in states])
-            policies = torch.stack(policies)
-            values = torch.stack(values)
+    def _board_to_tensor(self, board):
+        # Convert board state to 20-channel tensor (voir encode_positions)
+        return torch.from_numpy(encode_boards([board])[0])
+
+    def self_play(self, num_workers=4, games=100, train_every=10, simulations=800, weights_path='selfplay_weights.pt'):
+        # Auto-jeu multi-processus : les parties terminées alimentent self.memory, on entraîne
+        # toutes les `train_every` parties et les nouveaux poids sont repris par les workers
+        orchestrator = SelfPlay(self, num_workers=num_workers, simulations=simulations, weights_path=weights_path,
+                                precision=self.precision)
+        orchestrator.start()
+        try:
+            trained_at = 0
+            while orchestrator.games < games:
+                orchestrator.collect(timeout=1.0)
+                if orchestrator.games - trained_at >= train_every and self.memory:
+                    self.train(verbose=True)
+                    orchestrator.publish_weights()
+                    trained_at = orchestrator.games
+                    orchestrator.report()
+        finally:
+            orchestrator.stop()
+        return orchestrator
+
+"""#Distillation
+Entraîne un petit ChessNet (élève, voir NET_PROFILES) à reproduire les sorties d'un grand réseau (maître)
+sur les positions de la mémoire de rejeu : KL entre politiques adoucies par la température et MSE des valeurs.
+target_weight > 0 mélange en plus les cibles MCTS de la mémoire (replay_loss).
+Le maître n'est utilisé que via predict : un ChessNet ou un InferenceModel (export, int8...) conviennent.
+"""
 
-            # Forward pass
-            pred_policies, pred_values = self.model(states)
+class Distillation:
+    def __init__(self, teacher, student, memory, lr=0.001, temperature=1.0, value_weight=1.0, target_weight=0.0):
+        self.teacher = teacher
+        self.student = student
+        self.memory = memory
+        self.optimizer = optim.Adam(student.parameters(), lr=lr)
+        self.temperature = temperature
+        self.value_weight = value_weight
+        self.target_weight = target_weight
+        self.policy_kl = 0.0
+        self.value_mse = 0.0
+
+    def train(self, steps=1000, batch_size=64, num_workers=2, prefetch=4, verbose=False):
+        self.student.train()
+        with BatchPrefetcher(self.memory, batch_size, steps, num_workers=num_workers, depth=prefetch) as loader:
+            for batch in loader:
+                self._train_step(*batch)
+        if verbose:
+            loader.report()
+            print(f"distillation : KL politique {self.policy_kl:.4f}, MSE valeur {self.value_mse:.5f}")
+        return self.student
+
+    def _train_step(self, states, policy_indices, policy_probs, values):
+        teacher_policies, teacher_values = self.teacher.predict(states)
+        teacher_log = torch.log_softmax(torch.from_numpy(teacher_policies) / self.temperature, dim=1)
+        pred_policies, pred_values = self.student(states)
+        student_log = torch.log_softmax(pred_policies / self.temperature, dim=1)
+
+        # KL(maître || élève), remise à l'échelle par T² pour garder des gradients comparables
+        policy_kl = torch.mean(torch.sum(teacher_log.exp() * (teacher_log - student_log), dim=1))
+        value_mse = torch.mean((torch.from_numpy(teacher_values) - pred_values.squeeze(1))**2)
+        loss = self.temperature**2 * policy_kl + self.value_weight * value_mse
+        if self.target_weight:
+            loss = (1 - self.target_weight) * loss + self.target_weight * replay_loss(
+                pred_policies, pred_values, policy_indices, policy_probs, values)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        self.policy_kl, self.value_mse = policy_kl.item(), value_mse.item()
+
+    def evaluate(self, states):
+        # Écart élève / maître sur des positions tenues à part (mêmes mesures que quantization_report)
+        return quantization_report(self.teacher, self.student, states)
+
+"""#SelfPlay
+Auto-jeu multi-processus : un pool de workers joue des parties avec Engine.search contre les poids courants.
+
+Chaque worker renvoie les échantillons (position, politique cible, valeur) de ses parties terminées dans une file ;
+le processus principal (apprenant) les ajoute à ChessRL.memory. Les poids sont publiés dans un fichier que
+chaque worker recharge entre deux parties quand il a changé.
+"""
 
-            # Calculate loss
-            policy_loss = torch.mean(-torch.sum(policies * torch.log(pred_policies), dim=1))
-            value_loss = torch.mean((values - pred_values.squeeze())**2)
-            loss = policy_loss + value_loss
+def play_game(engine, max_moves=512, temperature_moves=30):
+    # Joue une partie d'auto-jeu et renvoie ses échantillons d'entraînement
+    board = Board()
+    positions = []
+    while len(board.history) < max_moves and not board.is_terminal():
+        move = engine.search(board)
+        board.apply_move(_record_position(engine, board, positions, move, temperature_moves))
+    return _game_samples(board, positions)
+
+async def play_game_async(engine, max_moves=512, temperature_moves=30):
+    # Variante de play_game pour un Engine en mode client (InferenceServer)
+    board = Board()
+    positions = []
+    while len(board.history) < max_moves and not board.is_terminal():
+        move = await engine.search_async(board)
+        board.apply_move(_record_position(engine, board, positions, move, temperature_moves))
+    return _game_samples(board, positions)
+
+def _record_position(engine, board, positions, move, temperature_moves):
+    # Enregistre la position et sa politique cible ; renvoie le coup à jouer
+    moves, probs = engine.visit_distribution()
+    policy = (policy_indices(moves).astype(np.int16), probs.astype(np.float32))  # cible creuse
+    snapshot = board.copy()
+    snapshot.history = []
+    positions.append((snapshot, policy))
+    if len(board.history) < temperature_moves:
+        move = moves[np.random.choice(len(moves), p=probs)]  # exploration en début de partie
+    return move
+
+def _game_samples(board, positions):
+    # Résultat vu par le joueur au trait dans la position finale, puis par chaque position
+    result = board.terminal_value() if board.is_terminal() else 0.0
+    final_turn = board.turn
+    return [(state, policy, torch.tensor(result if state.turn == final_turn else -result))
+            for state, policy in positions]
+
+def _self_play_worker(worker_id, weights_path, samples, stop, simulations, max_moves, seed, precision='fp32',
+                      net_config=None):
+    torch.set_num_threads(1)
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    model = ChessNet(**(net_config or {}))
+    loaded = None
+    while not stop.is_set():
+        # Nouveaux poids publiés depuis la dernière partie ?
+        mtime = os.path.getmtime(weights_path)
+        if mtime != loaded:
+            model.load_state_dict(torch.load(weights_path))
+            loaded = mtime
+            # Version réduite recalculée une seule fois par jeu de poids
+            search_model = model if precision == 'fp32' else quantize_inference(model, precision)
+        # Pas d'arrêt anticipé en auto-jeu : la distribution des visites complète sert de cible de politique
+        engine = Engine(search_model, simulations=simulations, early_stop=False)
+        start = time.perf_counter()
+        game = play_game(engine, max_moves=max_moves)
+        samples.put((worker_id, game, time.perf_counter() - start))
+
+class SelfPlay:
+    def __init__(self, rl, num_workers=4, simulations=800, max_moves=512, weights_path='selfplay_weights.pt',
+                 precision='fp32'):
+        self.rl = rl
+        self.precision = precision
+        self.num_workers = num_workers
+        self.simulations = simulations
+        self.max_moves = max_moves
+        self.weights_path = weights_path
+        self.context = mp.get_context('spawn')
+        self.samples = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.workers = []
+        self.games = 0
+        self.worker_games = [0] * num_workers
+        self.worker_time = [0.0] * num_workers
+        self.start_time = None
+
+    def publish_weights(self):
+        # Écriture atomique : un worker ne lit jamais un fichier à moitié écrit
+        tmp_path = self.weights_path + '.tmp'
+        torch.save(self.rl.model.state_dict(), tmp_path)
+        os.replace(tmp_path, self.weights_path)
+
+    def start(self):
+        self.publish_weights()
+        self.start_time = time.perf_counter()
+        for worker_id in range(self.num_workers):
+            worker = self.context.Process(target=_self_play_worker, daemon=True,
+                                          args=(worker_id, self.weights_path, self.samples, self.stop_event,
+                                                self.simulations, self.max_moves, random.randrange(2**31),
+                                                self.precision, self.rl.model.config))
+            worker.start()
+            self.workers.append(worker)
+
+    def collect(self, timeout=None):
+        # Transfère les parties terminées vers la mémoire de l'apprenant ; renvoie le nombre de parties reçues
+        received = 0
+        while True:
+            try:
+                worker_id, game, elapsed = self.samples.get(timeout=timeout if received == 0 else 0.01)
+            except queue.Empty:
+                return received
+            self.rl.memory.extend(game)
+            self.games += 1
+            self.worker_games[worker_id] += 1
+            self.worker_time[worker_id] += elapsed
+            received += 1
+
+    def games_per_hour(self):
+        # Débit de chaque worker, mesuré sur le temps passé à jouer
+        return [3600.0 * games / elapsed if elapsed > 0 else 0.0
+                for games, elapsed in zip(self.worker_games, self.worker_time)]
+
+    def report(self):
+        wall = time.perf_counter() - self.start_time
+        for worker_id, rate in enumerate(self.games_per_hour()):
+            print(f"worker {worker_id} : {self.worker_games[worker_id]} parties, {rate:.1f} parties/heure")
+        print(f"total : {self.games} parties en {wall:.0f} s, {3600.0 * self.games / max(wall, 1e-9):.1f} parties/heure")
+
+    def stop(self):
+        self.stop_event.set()
+        self.collect(timeout=0.01)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+
+"""#InferenceServer
+Serveur d'inférence asyncio avec regroupement dynamique, partagé par des parties concurrentes.
+
+Un seul ChessNet sert toutes les recherches : chacune soumet ses positions dans une file asyncio et attend un futur.
+Le serveur regroupe les requêtes jusqu'à max_batch_size positions ou max_wait_us microsecondes d'attente,
+puis exécute une passe du réseau dans un thread (le calcul PyTorch libère le GIL) pendant que les recherches continuent.
+"""
 
-            # Backward pass
-            self.optimizer.zero_grad()
-            loss.backward()
-            self.optimizer.step()
+class InferenceServer:
+    def __init__(self, model, max_batch_size=64, max_wait_us=500):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.requests = None
+        self.task = None
+        self.batches = 0
+        self.positions = 0
+
+    @property
+    def mean_batch_size(self):
+        return self.positions / self.batches if self.batches else 0.0
+
+    async def evaluate(self, inputs):
+        # inputs : (n, 20, 8, 8) ; renvoie (politiques (n, 4672), valeurs (n,))
+        if self.task is None:
+            await self.start()  # démarrage à la première requête
+        future = asyncio.get_running_loop().create_future()
+        await self.requests.put((np.array(inputs, copy=True), future))
+        return await future
+
+    async def start(self):
+        self.requests = asyncio.Queue()
+        self.task = asyncio.create_task(self._serve())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.requests.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait_us / 1e6
+            # Regroupement : on attend d'autres requêtes jusqu'au lot plein ou à l'échéance
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self.requests.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(request)
+                size += len(request[0])
 
-    def _board_to_tensor(self, board):
-        # Convert board state to 20-channel tensor
-        tensor = torch.zeros(20, 8, 8)
-        # ... implementation of board state encoding ...
-        return tensor
+            inputs = torch.from_numpy(np.concatenate([inputs for inputs, _ in pending]))
+            try:
+                policies, values = await loop.run_in_executor(None, self.model.predict, inputs)
+            except Exception as exc:
+                # L'erreur est transmise aux requêtes du lot ; le serveur continue de répondre aux suivantes
+                for _, future in pending:
+                    if not future.cancelled():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.positions += len(inputs)
+            offset = 0
+            for request_inputs, future in pending:
+                count = len(request_inputs)
+                if not future.cancelled():
+                    future.set_result((policies[offset:offset + count], values[offset:offset + count]))
+                offset += count
+
+def play_concurrent_games(model, num_games=32, simulations=800, max_batch_size=64, max_wait_us=500, **game_options):
+    # Joue num_games parties d'auto-jeu en parallèle (coroutines) sur un seul modèle partagé
+    async def run():
+        server = InferenceServer(model, max_batch_size=max_batch_size, max_wait_us=max_wait_us)
+        await server.start()
+        try:
+            games = await asyncio.gather(*[
+                play_game_async(Engine(model, simulations=simulations, server=server, early_stop=False),
+                                **game_options)
+                for _ in range(num_games)])
+        finally:
+            await server.stop()
+        return games, server
+
+    return asyncio.run(run())
 
 """#Main
 Main (exécution du jeu)
@@ -469,16 +2328,20 @@ Main (exécution du jeu)
 """
 
 class Main:
-    def __init__(self, ai=None):
+    def __init__(self, ai=None, ponder=True):
         self.board = Board()
         self.ai = ai or ChessRL()
         self.human_color = 'white'
+        self.ponder = ponder  # le moteur réfléchit pendant que le joueur humain saisit son coup
 
     def play(self):
-        while not self.board.is_checkmate():
+        while not self.board.is_terminal():
             print(self.board)
             if self.board.current_player == self.human_color:
+                if self.ponder:
+                    self.ai.mcts.start_pondering(self.board)
                 move = self.get_human_move()
+                self.ai.mcts.stop_pondering()
             else:
                 move = self.ai.get_move(self.board)
             self.board.apply_move(move)
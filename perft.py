@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""perft.py
+
+Perft et micro-benchmarks du générateur de coups, pour les deux implémentations de Board :
+nn_mctschesszero.Board (bitboards, coups légaux complets) et rl_mctschesszero.Board (grille 8x8).
+
+Le perft compte les feuilles de l'arbre des coups jusqu'à une profondeur donnée depuis des positions de référence
+et compare aux valeurs connues : c'est la base de correction (et de vitesse, en nœuds/s) de toute modification
+du code des échiquiers. Les coups de la racine peuvent être répartis sur plusieurs processus.
+
+Le Board de rl_mctschesszero ne connaît ni le trait, ni les roques, ni la prise en passant, ni la promotion,
+et ne filtre pas les coups qui laissent le roi en échec : ses comptes divergent des valeurs de référence
+et sont signalés comme tels.
+
+Usage :
+    python perft.py                         # perft du Board nn jusqu'à la profondeur 3
+    python perft.py --board rl --depth 2
+    python perft.py --depth 4 --workers 4   # coups de la racine répartis sur 4 processus
+    python perft.py --bench                 # micro-benchmarks
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import time
+
+import nn_mctschesszero as nn_chess
+import rl_mctschesszero as rl_chess
+
+# (nom, FEN, nombre de feuilles aux profondeurs 1, 2, ...) : positions de référence du wiki chessprogramming
+PERFT_POSITIONS = [
+    ('initiale', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+     (20, 400, 8902, 197281, 4865609)),
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     (48, 2039, 97862, 4085603)),
+    ('position 3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     (14, 191, 2812, 43238, 674624)),
+    ('position 4', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     (6, 264, 9467, 422333)),
+    ('position 5', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     (44, 1486, 62379, 2103487)),
+]
+
+"""#Perft"""
+
+def perft_nn(board, depth):
+    # make/unmake sur un seul échiquier ; au dernier niveau on compte les coups sans les jouer
+    if depth == 0:
+        return 1
+    moves = board.get_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.apply_move(move)
+        nodes += perft_nn(board, depth - 1)
+        board.undo_move()
+    return nodes
+
+def perft_rl(board, color, depth):
+    # Board.undo_move ne restaure pas les prises : la case d'arrivée est sauvegardée et remise à la main
+    if depth == 0:
+        return 1
+    moves = board.get_all_valid_moves(color)
+    if depth == 1:
+        return len(moves)
+    opponent = 'black' if color == 'white' else 'white'
+    grid = board.board
+    nodes = 0
+    for start, end in moves:
+        piece, captured = grid[start[0]][start[1]], grid[end[0]][end[1]]
+        grid[end[0]][end[1]], grid[start[0]][start[1]] = piece, None
+        nodes += perft_rl(board, opponent, depth - 1)
+        grid[start[0]][start[1]], grid[end[0]][end[1]] = piece, captured
+    return nodes
+
+def _side_to_move(fen):
+    fields = fen.split()
+    return 'black' if len(fields) > 1 and fields[1] == 'b' else 'white'
+
+def _root(kind, fen):
+    # Échiquier de départ et coups de la racine pour l'implémentation `kind`
+    if kind == 'nn':
+        board = nn_chess.Board.from_fen(fen)
+        return board, board.get_legal_moves()
+    board = rl_chess.Board.from_fen(fen)
+    return board, board.get_all_valid_moves(_side_to_move(fen))
+
+def _perft_from(kind, fen, depth):
+    if kind == 'nn':
+        return perft_nn(nn_chess.Board.from_fen(fen), depth)
+    return perft_rl(rl_chess.Board.from_fen(fen), _side_to_move(fen), depth)
+
+def _perft_subtree(args):
+    # Tâche d'un processus : le sous-arbre d'un coup de la racine (l'échiquier est reconstruit depuis la FEN)
+    kind, fen, move_index, depth = args
+    board, moves = _root(kind, fen)
+    move = moves[move_index]
+    if kind == 'nn':
+        board.apply_move(move)
+        return perft_nn(board, depth - 1)
+    start, end = move
+    board.board[end[0]][end[1]], board.board[start[0]][start[1]] = board.board[start[0]][start[1]], None
+    opponent = 'black' if _side_to_move(fen) == 'white' else 'white'
+    return perft_rl(board, opponent, depth - 1)
+
+def perft(kind, fen, depth, workers=1):
+    # Nombre de feuilles à `depth` ; avec workers > 1, un processus par coup de la racine (pool)
+    if workers <= 1 or depth <= 1:
+        return _perft_from(kind, fen, depth)
+    _, moves = _root(kind, fen)
+    tasks = [(kind, fen, index, depth) for index in range(len(moves))]
+    with mp.get_context('spawn').Pool(workers) as pool:
+        return sum(pool.imap_unordered(_perft_subtree, tasks))
+
+def run_perft(kind='nn', max_depth=3, workers=1, positions=PERFT_POSITIONS):
+    # Compare aux valeurs de référence et mesure les nœuds/s ; renvoie True si tout concorde
+    all_ok = True
+    for name, fen, expected in positions:
+        for depth in range(1, min(max_depth, len(expected)) + 1):
+            start = time.perf_counter()
+            nodes = perft(kind, fen, depth, workers)
+            elapsed = time.perf_counter() - start
+            ok = nodes == expected[depth - 1]
+            all_ok &= ok
+            print(f"{kind} {name:11s} d={depth} : {nodes:10d} (attendu {expected[depth - 1]:10d}) "
+                  f"{'OK' if ok else 'ÉCHEC':5s} {nodes / max(elapsed, 1e-9):12.0f} nœuds/s")
+    return all_ok
+
+"""#Micro-benchmarks"""
+
+def _rate(function, seconds):
+    # Appels par seconde de `function` pendant environ `seconds` secondes
+    function()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+def _cycle(functions):
+    # Une fonction qui appelle tour à tour chacune des fonctions (une par position)
+    state = {'index': 0}
+    def call():
+        functions[state['index'] % len(functions)]()
+        state['index'] += 1
+    return call
+
+def _nn_operations(fen):
+    board = nn_chess.Board.from_fen(fen)
+    moves = board.get_legal_moves()
+
+    def make_unmake():
+        for move in moves:
+            board.apply_move(move)
+            board.undo_move()
+    return {
+        'get_legal_moves': board.get_legal_moves,
+        'is_check': board.is_check,
+        'is_checkmate': board.is_checkmate,
+        'apply_move+undo_move': make_unmake,
+    }, len(moves)
+
+def _rl_operations(fen):
+    board = rl_chess.Board.from_fen(fen)
+    color = _side_to_move(fen)
+    moves = board.get_all_valid_moves(color)
+    grid = board.board
+
+    def is_checkmate():
+        # is_checkmate joue et annule des coups sans restaurer les prises : la grille est restaurée
+        saved = [row[:] for row in grid]
+        board.is_checkmate(color)
+        grid[:] = saved
+
+    def move_undo():
+        for start, end in moves:
+            captured = grid[end[0]][end[1]]
+            if board.move(start, end):
+                board.undo_move(start, end)
+                grid[end[0]][end[1]] = captured
+    return {
+        'get_all_valid_moves': lambda: board.get_all_valid_moves(color),
+        'is_check': lambda: board.is_check(color),
+        'is_checkmate': is_checkmate,
+        'move+undo_move': move_undo,
+    }, len(moves)
+
+def run_benchmarks(kind='nn', seconds=1.0, positions=PERFT_POSITIONS):
+    # Débit de chaque opération, les positions de référence étant parcourues à tour de rôle ;
+    # les opérations par coup (make/unmake) sont ramenées au nombre de coups joués
+    operations, move_counts = zip(*[(_nn_operations if kind == 'nn' else _rl_operations)(fen)
+                                    for _, fen, _ in positions])
+    mean_moves = sum(move_counts) / len(move_counts)
+    results = {}
+    for name in operations[0]:
+        rate = _rate(_cycle([ops[name] for ops in operations]), seconds)
+        if 'undo' in name:
+            rate *= mean_moves
+        results[name] = rate
+        print(f"{kind} {name:22s} : {rate:12.0f} {'coups' if 'undo' in name else 'appels'}/s")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft et micro-benchmarks du générateur de coups")
+    parser.add_argument('--board', choices=('nn', 'rl', 'both'), default='nn')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--bench', action='store_true', help="micro-benchmarks au lieu du perft")
+    parser.add_argument('--seconds', type=float, default=1.0, help="durée de chaque micro-benchmark")
+    args = parser.parse_args()
+
+    kinds = ('nn', 'rl') if args.board == 'both' else (args.board,)
+    ok = True
+    for kind in kinds:
+        if args.bench:
+            run_benchmarks(kind, args.seconds)
+        else:
+            ok &= run_perft(kind, args.depth, args.workers)
+    sys.exit(0 if ok else 1)
@@ -320,6 +320,31 @@ class Board:
 
             self.board[6][i] = Pawn('white')
 
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Construit un échiquier à partir de la partie placement d'une position FEN.
+        Ce Board ne gère ni le trait, ni les roques, ni la prise en passant : les autres champs sont ignorés.
+
+        Args:
+            fen (str): La position au format FEN (ex: 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1').
+
+        Returns:
+            Board: L'échiquier correspondant.
+        """
+        pieces = {'k': King, 'q': Queen, 'r': Rook, 'b': Bishop, 'n': Knight, 'p': Pawn}
+        board = cls()
+        board.board = [[None for _ in range(8)] for _ in range(8)]
+        for row, rank in enumerate(fen.split()[0].split('/')):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    board.board[row][col] = pieces[char.lower()]('white' if char.isupper() else 'black')
+                    col += 1
+        return board
+
     def display(self):
         """
         Affiche l'échiquier dans un format lisible.
@@ -582,76 +607,662 @@ class Board:
 
 import random
 import math
+import time
+import threading
+import multiprocessing as mp
+import numpy as np
+
+class TreeStore:
+    """
+    Arbre MCTS stocké en tableaux NumPy (structure de tableaux) indexés par des identifiants entiers.
+    Les enfants d'un noeud occupent une plage contiguë [child_start, child_start + child_count).
+    Les tableaux doublent de taille quand ils sont pleins ; aucun objet Python n'est conservé par noeud
+    hormis l'échiquier associé, qui n'est construit qu'à la première visite du noeud (None avant).
+    """
+
+    FIELDS = (('visits', np.int32), ('value', np.float64), ('parent', np.int32),
+              ('move', np.int32), ('child_start', np.int32), ('child_count', np.int32))
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.boards = []  # L'état du jeu de chaque noeud, None tant qu'il n'a pas été visité
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def _reserve(self, needed):
+        capacity = len(self.visits)
+        if self.size + needed <= capacity:
+            return
+        capacity = max(capacity * 2, self.size + needed)  # Croissance géométrique
+        for name, dtype in self.FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, array)
+
+    def add_node(self, board, parent=-1, move=None):
+        """Ajoute un noeud et renvoie son identifiant"""
+        self._reserve(1)
+        index = self.size
+        self.size += 1
+        self.visits[index] = 0
+        self.value[index] = 0.0
+        self.parent[index] = parent
+        self.move[index] = encode_move(move) if move is not None else -1
+        self.child_start[index] = 0
+        self.child_count[index] = 0
+        self.boards.append(board)
+        return index
+
+    def add_children(self, index, moves):
+        """Ajoute les enfants d'un noeud dans une plage contiguë, sans construire leurs échiquiers"""
+        self._reserve(len(moves))
+        start = self.size
+        for move in moves:
+            self.add_node(None, parent=index, move=move)
+        self.child_start[index] = start
+        self.child_count[index] = len(moves)
+
+    def extract(self, root):
+        """
+        Copie le sous-arbre de root dans un nouvel arbre compact, dont root est le noeud 0.
+        Les enfants sont recopiés niveau par niveau, ce qui conserve leurs plages contiguës.
+
+        Args:
+            root (int): L'identifiant du noeud qui devient la racine.
+
+        Returns:
+            TreeStore: Le nouvel arbre ; le reste de l'ancien arbre peut être libéré.
+        """
+        levels = [np.array([root])]
+        starts = []
+        size = 1
+        while len(levels[-1]):
+            frontier = levels[-1]
+            counts = self.child_count[frontier].astype(np.int64)
+            starts.append(size + np.cumsum(counts) - counts)
+            children = np.repeat(self.child_start[frontier] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            size += len(children)
+            levels.append(children)
+        nodes = np.concatenate(levels)
+
+        tree = TreeStore(capacity=max(2 * len(nodes), 1024))
+        tree.size = len(nodes)
+        for name, _ in self.FIELDS:
+            getattr(tree, name)[:len(nodes)] = getattr(self, name)[nodes]
+        tree.child_start[:len(nodes)] = np.concatenate(starts + [np.zeros(0, dtype=np.int64)])
+        parents = np.repeat(np.arange(len(nodes) - len(levels[-1])), tree.child_count[:len(nodes) - len(levels[-1])])
+        tree.parent[0] = -1
+        tree.parent[1:len(nodes)] = parents
+        tree.move[0] = -1
+        tree.boards = [self.boards[i] for i in nodes.tolist()]
+        return tree
+
+
+def encode_move(move):
+    """Convertit un mouvement ((ligne, colonne), (ligne, colonne)) en entier"""
+    start, end = move
+    return (start[0] * 8 + start[1]) * 64 + end[0] * 8 + end[1]
+
+def decode_move(code):
+    """Inverse de encode_move"""
+    start, end = divmod(code, 64)
+    return (divmod(start, 8), divmod(end, 8))
+
 
 class Node:
-    def __init__(self, board, parent=None, move=None):
-        self.board = board  # L'état du jeu à ce point
-        self.parent = parent  # Le parent dans l'arbre
-        self.move = move  # Le mouvement qui a mené à cet état
-        self.children = []  # Enfants de ce noeud (états futurs possibles)
-        self.visits = 0  # Nombre de fois que ce noeud a été exploré
-        self.value = 0  # La valeur (récompense) associée à ce noeud
+    """Vue légère (arbre, index) sur un noeud du TreeStore"""
+
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def board(self):
+        return self.tree.boards[self.index]  # L'état du jeu à ce point (None avant la première visite)
+
+    @board.setter
+    def board(self, board):
+        self.tree.boards[self.index] = board
+
+    @property
+    def parent(self):
+        parent = int(self.tree.parent[self.index])  # Le parent dans l'arbre
+        return Node(self.tree, parent) if parent >= 0 else None
+
+    @property
+    def move(self):
+        code = int(self.tree.move[self.index])  # Le mouvement qui a mené à cet état
+        return decode_move(code) if code >= 0 else None
+
+    @property
+    def children(self):
+        start = int(self.tree.child_start[self.index])  # Enfants de ce noeud (états futurs possibles)
+        return [Node(self.tree, i) for i in range(start, start + int(self.tree.child_count[self.index]))]
+
+    @property
+    def visits(self):
+        return int(self.tree.visits[self.index])  # Nombre de fois que ce noeud a été exploré
+
+    @visits.setter
+    def visits(self, value):
+        self.tree.visits[self.index] = value
+
+    @property
+    def value(self):
+        return float(self.tree.value[self.index])  # La valeur (récompense) associée à ce noeud
+
+    @value.setter
+    def value(self, value):
+        self.tree.value[self.index] = value
 
     def is_fully_expanded(self):
         """Vérifie si tous les enfants de ce noeud ont été générés"""
-        return len(self.children) > 0
+        return self.tree.child_count[self.index] > 0
 
     def best_child(self, exploration_weight=1.41):
-        """Choisit le meilleur enfant en fonction de l'UCT (Upper Confidence Bound for Trees)"""
-        best_value = -float('inf')
-        best_move = None
-        for child in self.children:
-            uct_value = (child.value / (child.visits + 1e-6)) + exploration_weight * math.sqrt(math.log(self.visits + 1) / (child.visits + 1e-6))
-            if uct_value > best_value:
-                best_value = uct_value
-                best_move = child
-        return best_move
+        """Choisit le meilleur enfant en fonction de l'UCT (Upper Confidence Bound for Trees), calculé d'un bloc"""
+        tree = self.tree
+        start = int(tree.child_start[self.index])
+        end = start + int(tree.child_count[self.index])
+        if start == end:
+            return None
+        visits = tree.visits[start:end] + 1e-6
+        uct_values = tree.value[start:end] / visits + \
+                     exploration_weight * np.sqrt(math.log(self.visits + 1) / visits)
+        return Node(tree, start + int(np.argmax(uct_values)))
+
+"""#Rollout
+Noyau de simulation (playout) sur un échiquier entier compact, utilisé par Engine.simulation.
+"""
+
+# Codes des pièces : positifs pour les blancs, négatifs pour les noirs, 0 pour une case vide
+ROLLOUT_CODES = {'pawn': 1, 'knight': 2, 'bishop': 3, 'rook': 4, 'queen': 5, 'king': 6}
+ROLLOUT_VALUES = (0, 1, 3, 3, 5, 9, 0)
+ROLLOUT_OFFBOARD = 7
+# Échiquier 10x12 : la case (ligne, colonne) est à l'index 21 + 10*ligne + colonne, entourée de cases hors-jeu
+ROLLOUT_SQUARES = tuple(21 + 10 * row + col for row in range(8) for col in range(8))
+KNIGHT_STEPS = (-21, -19, -12, -8, 8, 12, 19, 21)
+KING_STEPS = (-11, -10, -9, -1, 1, 9, 10, 11)
+BISHOP_STEPS = (-11, -9, 9, 11)
+ROOK_STEPS = (-10, -1, 1, 10)
+PIECE_STEPS = (None, None, KNIGHT_STEPS, BISHOP_STEPS, ROOK_STEPS, KING_STEPS, KING_STEPS)
+
+class RolloutKernel:
+    """
+    Playouts bornés sur un tableau d'entiers (10x12) réutilisé d'une simulation à l'autre.
+
+    Les coups sont pseudo-légaux, avec les règles du Board de ce module (ni roque, ni prise en passant) ;
+    la prise du roi termine la partie, un pion qui atteint la dernière rangée devient une dame.
+    Les prises sont choisies en priorité (avec la probabilité capture_bias) ; après max_plies demi-coups,
+    la position est évaluée par le matériel, tenu à jour à chaque prise. Les coups générés sont écrits dans
+    des tampons préalloués : aucun objet n'est créé pendant un demi-coup.
+    """
+
+    def __init__(self, max_plies=40, capture_bias=0.8, material_scale=10.0, seed=None):
+        self.max_plies = max_plies
+        self.capture_bias = capture_bias
+        self.material_scale = material_scale
+        self.random = random.Random(seed)
+        self.squares = [ROLLOUT_OFFBOARD] * 120
+        self.moves_from = [0] * 256
+        self.moves_to = [0] * 256
+        self.captures = [0] * 256  # index (dans moves_from/moves_to) des coups qui prennent
+        self.material = 0
+
+    def load(self, board):
+        """
+        Copie la grille d'un Board dans le tableau d'entiers et calcule le matériel (point de vue des blancs).
+
+        Args:
+            board (Board): L'échiquier à simuler.
+        """
+        squares = self.squares
+        material = 0
+        for row in range(8):
+            for col in range(8):
+                piece = board.board[row][col]
+                code = 0
+                if piece is not None:
+                    code = ROLLOUT_CODES[piece.name] if piece.color == 'white' else -ROLLOUT_CODES[piece.name]
+                    material += ROLLOUT_VALUES[code] if code > 0 else -ROLLOUT_VALUES[-code]
+                squares[21 + 10 * row + col] = code
+        self.material = material
+
+    def playout(self, board, to_move='white'):
+        """
+        Joue une partie simulée depuis `board`, au plus max_plies demi-coups.
+
+        Args:
+            board (Board): La position de départ (non modifiée).
+            to_move (str): La couleur au trait ('white' ou 'black').
+
+        Returns:
+            float: Le résultat du point de vue des blancs : 1 / -1 si un roi est pris, 0 sans coup possible,
+            sinon l'évaluation matérielle tanh(matériel / material_scale) à la coupure.
+        """
+        self.load(board)
+        squares = self.squares
+        randrange = self.random.randrange
+        rand = self.random.random
+        side = 1 if to_move == 'white' else -1
+        for _ in range(self.max_plies):
+            count, captures = self._generate(side)
+            if count == 0:
+                return 0.0
+            if captures and rand() < self.capture_bias:
+                index = self.captures[randrange(captures)]
+            else:
+                index = randrange(count)
+            frm, to = self.moves_from[index], self.moves_to[index]
+            captured = squares[to]
+            if captured == -6 * side:
+                return float(side)  # roi pris : le camp au trait gagne
+            piece = squares[frm]
+            squares[frm] = 0
+            if captured:
+                self.material += ROLLOUT_VALUES[-captured] if captured < 0 else -ROLLOUT_VALUES[captured]
+            if piece == side and (to < 30 if side > 0 else to > 90):
+                piece = 5 * side  # promotion en dame
+                self.material += 8 * side
+            squares[to] = piece
+            side = -side
+        return math.tanh(self.material / self.material_scale)
+
+    def _generate(self, side):
+        # Coups pseudo-légaux du camp `side` dans les tampons ; renvoie (nombre de coups, nombre de prises)
+        squares = self.squares
+        moves_from, moves_to, captures = self.moves_from, self.moves_to, self.captures
+        count = capture_count = 0
+        forward = -10 * side  # les blancs montent vers la ligne 0
+        for frm in ROLLOUT_SQUARES:
+            piece = squares[frm] * side
+            if piece <= 0:
+                continue
+            if piece == 1:
+                to = frm + forward
+                if squares[to] == 0:
+                    moves_from[count], moves_to[count] = frm, to
+                    count += 1
+                    # Double pas depuis la rangée de départ (ligne 6 pour les blancs, 1 pour les noirs)
+                    if (81 <= frm <= 88 if side > 0 else 31 <= frm <= 38) and squares[to + forward] == 0:
+                        moves_from[count], moves_to[count] = frm, to + forward
+                        count += 1
+                for to in (frm + forward - 1, frm + forward + 1):
+                    target = squares[to]
+                    if target != ROLLOUT_OFFBOARD and target * side < 0:
+                        captures[capture_count] = count
+                        capture_count += 1
+                        moves_from[count], moves_to[count] = frm, to
+                        count += 1
+            elif piece == 2 or piece == 6:
+                for step in PIECE_STEPS[piece]:
+                    to = frm + step
+                    target = squares[to]
+                    if target == ROLLOUT_OFFBOARD or target * side > 0:
+                        continue
+                    if target:
+                        captures[capture_count] = count
+                        capture_count += 1
+                    moves_from[count], moves_to[count] = frm, to
+                    count += 1
+            else:
+                for step in PIECE_STEPS[piece]:
+                    to = frm + step
+                    target = squares[to]
+                    while target == 0:
+                        moves_from[count], moves_to[count] = frm, to
+                        count += 1
+                        to += step
+                        target = squares[to]
+                    if target != ROLLOUT_OFFBOARD and target * side < 0:
+                        captures[capture_count] = count
+                        capture_count += 1
+                        moves_from[count], moves_to[count] = frm, to
+                        count += 1
+        return count, capture_count
+
+def _playout_tables():
+    """
+    Tables des coups géométriques (départ, arrivée) partagées par toutes les parties de BatchedPlayouts :
+    rayons de dame jusqu'à 7 cases et sauts de cavalier, avec un masque 64 bits des cases intermédiaires.
+    Pour chaque (genre de pièce, case de départ), la liste des coups que la pièce peut y jouer est rangée
+    à plat (début, nombre) ; genres : 1 pion blanc, 2-6 cavalier à roi, 7 pion noir.
+    """
+    directions = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+    knight_jumps = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+    moves = []  # (départ, arrivée, cases intermédiaires, dr, dc, distance, est un saut de cavalier)
+    for frm in range(64):
+        row, col = divmod(frm, 8)
+        for dr, dc in directions:
+            for distance in range(1, 8):
+                r, c = row + dr * distance, col + dc * distance
+                if not (0 <= r < 8 and 0 <= c < 8):
+                    break
+                between = [(row + dr * i) * 8 + col + dc * i for i in range(1, distance)]
+                moves.append((frm, r * 8 + c, between, dr, dc, distance, False))
+        for dr, dc in knight_jumps:
+            r, c = row + dr, col + dc
+            if 0 <= r < 8 and 0 <= c < 8:
+                moves.append((frm, r * 8 + c, [], dr, dc, 1, True))
+
+    def allowed(kind, frm, dr, dc, distance, knight):
+        if kind == 2:
+            return knight
+        if knight:
+            return False
+        diagonal = dr != 0 and dc != 0
+        if kind in (1, 7):
+            forward, start_row = (-1, 6) if kind == 1 else (1, 1)
+            return dr == forward and (distance == 1 or (dc == 0 and distance == 2 and frm // 8 == start_row))
+        return {3: diagonal, 4: not diagonal, 5: True, 6: distance == 1}[kind]
+
+    candidates = [[[] for _ in range(64)] for _ in range(8)]
+    for i, (frm, to, squares, dr, dc, distance, knight) in enumerate(moves):
+        for kind in range(1, 8):
+            if allowed(kind, frm, dr, dc, distance, knight):
+                candidates[kind][frm].append(i)
+    lists = [candidates[kind][frm] for kind in range(8) for frm in range(64)]
+    counts = np.array([len(moves_from_square) for moves_from_square in lists], dtype=np.int64)
+    return (np.array([m[0] for m in moves], dtype=np.int64),
+            np.array([m[1] for m in moves], dtype=np.int64),
+            np.array([sum(1 << square for square in m[2]) for m in moves], dtype=np.uint64),
+            np.array([m[4] != 0 for m in moves]),  # changement de colonne : pour un pion, c'est une prise
+            np.cumsum(counts) - counts, counts,
+            np.array([i for moves_from_square in lists for i in moves_from_square], dtype=np.int64))
+
+(PLAYOUT_FROM, PLAYOUT_TO, PLAYOUT_BETWEEN, PLAYOUT_SIDEWAYS,
+ PLAYOUT_START, PLAYOUT_COUNT, PLAYOUT_CANDIDATES) = _playout_tables()
+PLAYOUT_VALUES = np.array(ROLLOUT_VALUES, dtype=np.float64)
+
+class BatchedPlayouts:
+    """
+    Environnement vectorisé : K parties tenues dans un tableau (K, 8, 8) int8 (mêmes codes que RolloutKernel),
+    avancées d'un demi-coup toutes ensemble par des opérations NumPy.
+
+    Les coups sont indexés dans les tables PLAYOUT_FROM / PLAYOUT_TO (coups géométriques). legal_moves()
+    rassemble, pour toutes les parties à la fois, les coups candidats des pièces du camp au trait et ne garde
+    que les coups pseudo-légaux ; step() joue un coup par partie. playout() enchaîne les deux avec la même
+    politique que RolloutKernel (prises privilégiées, coupure matérielle).
+    """
+
+    def __init__(self, games=64, max_plies=40, capture_bias=0.8, material_scale=10.0, seed=None):
+        self.games = games
+        self.max_plies = max_plies
+        self.capture_bias = capture_bias
+        self.material_scale = material_scale
+        self.random = np.random.default_rng(seed)
+        self.boards = np.zeros((games, 8, 8), dtype=np.int8)
+        self.side = np.ones(games, dtype=np.int8)        # 1 : blancs au trait, -1 : noirs
+        self.material = np.zeros(games)                   # point de vue des blancs
+        self.result = np.zeros(games)
+        self.active = np.ones(games, dtype=bool)
+
+    def reset(self, board, to_move='white'):
+        """
+        Place la même position dans les K parties.
+
+        Args:
+            board (Board): La position de départ.
+            to_move (str): La couleur au trait ('white' ou 'black').
+        """
+        grid = np.zeros((8, 8), dtype=np.int8)
+        for row in range(8):
+            for col in range(8):
+                piece = board.board[row][col]
+                if piece is not None:
+                    grid[row, col] = ROLLOUT_CODES[piece.name] * (1 if piece.color == 'white' else -1)
+        self.boards[:] = grid
+        self.side[:] = 1 if to_move == 'white' else -1
+        self.material[:] = (np.sign(grid) * PLAYOUT_VALUES[np.abs(grid)]).sum()
+        self.result[:] = 0.0
+        self.active[:] = True
+
+    def legal_moves(self, games=None):
+        """
+        Coups pseudo-légaux des parties indiquées, à plat.
+
+        Args:
+            games (np.ndarray): Indices des parties concernées (toutes par défaut).
+
+        Returns:
+            tuple: (position de la partie dans `games`, index du coup dans PLAYOUT_FROM / PLAYOUT_TO,
+            prise ou non) pour chaque coup, rangés par partie.
+        """
+        games = np.arange(self.games) if games is None else games
+        flat = self.boards[games].reshape(len(games), 64)
+        side = self.side[games]
+        # Pièces du camp au trait, puis leurs coups candidats lus dans les tables (genre, case)
+        owners, squares = np.nonzero(flat * side[:, None] > 0)
+        piece = flat[owners, squares] * side[owners]
+        kind = np.where((piece == 1) & (side[owners] < 0), 7, piece)
+        key = kind.astype(np.int64) * 64 + squares
+        counts = PLAYOUT_COUNT[key]
+        offsets = np.repeat(PLAYOUT_START[key] - np.cumsum(counts) + counts, counts)
+        moves = PLAYOUT_CANDIDATES[offsets + np.arange(offsets.size)]
+        owners = np.repeat(owners, counts)
+        pawn = np.repeat(piece == 1, counts)
+
+        target = flat[owners, PLAYOUT_TO[moves]] * side[owners]  # < 0 : pièce adverse, 0 : case vide
+        # Occupation en bitboard : un seul ET avec le masque des cases intermédiaires de chaque coup
+        occupied = np.packbits(flat != 0, axis=1, bitorder='little').view('<u8')[:, 0]
+        clear = (occupied[owners] & PLAYOUT_BETWEEN[moves]) == 0
+        # Pions : prise en diagonale seulement, poussée seulement vers une case vide
+        legal = clear & np.where(pawn, np.where(PLAYOUT_SIDEWAYS[moves], target < 0, target == 0), target <= 0)
+        return owners[legal], moves[legal], target[legal] < 0
+
+    def step(self, games, moves):
+        """
+        Joue un coup dans chacune des parties indiquées ; une prise de roi termine la partie.
+
+        Args:
+            games (np.ndarray): Indices des parties.
+            moves (np.ndarray): Index du coup joué (dans PLAYOUT_FROM / PLAYOUT_TO) pour chaque partie.
+        """
+        flat = self.boards.reshape(self.games, 64)
+        frm, to = PLAYOUT_FROM[moves], PLAYOUT_TO[moves]
+        piece, captured = flat[games, frm], flat[games, to]
+        side = self.side[games]
+
+        king_taken = captured == -6 * side
+        self.result[games[king_taken]] = side[king_taken]
+        self.active[games[king_taken]] = False
+
+        self.material[games] -= np.sign(captured) * PLAYOUT_VALUES[np.abs(captured)]
+        promotion = (np.abs(piece) == 1) & ((to < 8) | (to >= 56))  # un pion n'avance que vers l'avant
+        piece = np.where(promotion, 5 * side, piece).astype(np.int8)
+        self.material[games] += 8 * side * promotion
+        flat[games, to] = piece
+        flat[games, frm] = 0
+        self.side[games] = -side
+
+    def playout(self, board, to_move='white'):
+        """
+        Joue K parties simulées depuis `board`, au plus max_plies demi-coups.
+
+        Args:
+            board (Board): La position de départ (non modifiée).
+            to_move (str): La couleur au trait ('white' ou 'black').
+
+        Returns:
+            np.ndarray: Les K résultats du point de vue des blancs (voir RolloutKernel.playout).
+        """
+        self.reset(board, to_move)
+        for _ in range(self.max_plies):
+            games = np.flatnonzero(self.active)
+            if games.size == 0:
+                break
+            owners, moves, captures = self.legal_moves(games)
+            # Parmi les prises avec la probabilité capture_bias (s'il y en a), sinon parmi tous les coups
+            prefer = (self.random.random(games.size) < self.capture_bias) & \
+                (np.bincount(owners[captures], minlength=games.size) > 0)
+            keep = captures | ~prefer[owners]
+            owners, moves = owners[keep], moves[keep]
+            counts = np.bincount(owners, minlength=games.size)
+            stuck = counts == 0
+            self.active[games[stuck]] = False  # aucun coup : partie nulle
+            # Coup tiré uniformément dans la plage de chaque partie (les coups sont rangés par partie)
+            chosen = np.cumsum(counts) - counts + (self.random.random(games.size) * counts).astype(np.int64)
+            self.step(games[~stuck], moves[chosen[~stuck]])
+        unfinished = self.active
+        self.result[unfinished] = np.tanh(self.material[unfinished] / self.material_scale)
+        return self.result.copy()
+
+def _root_search(args):
+    """
+    Tâche d'un processus de la recherche parallèle à la racine : une recherche indépendante (graine propre).
+
+    Args:
+        args (tuple): (board, current_player, iterations, seed, options du constructeur d'Engine,
+            movetime, nodes).
+
+    Returns:
+        tuple: (liste des (coup, visites, valeur cumulée) des enfants de la racine, itérations effectuées).
+    """
+    board, current_player, iterations, seed, options, movetime, nodes = args
+    random.seed(seed)
+    np.random.seed(seed)
+    engine = Engine(board, current_player, seed=seed, **options)
+    engine.mcts(iterations, movetime=movetime, nodes=nodes)
+    return [(child.move, child.visits, child.value) for child in engine.root_node.children], engine.search_iterations
+
+# La recherche ne lit l'horloge qu'une itération sur CLOCK_CHECK_INTERVAL (puissance de 2)
+CLOCK_CHECK_INTERVAL = 16
+
+def search_stop_time(start, movetime=None, deadline=None):
+    """
+    Instant (time.perf_counter()) où la recherche doit s'arrêter : la première des deux limites.
+
+    Args:
+        start (float): Début de la recherche.
+        movetime (float): Durée maximale, en secondes.
+        deadline (float): Instant limite absolu.
+
+    Returns:
+        float: L'instant d'arrêt, ou None sans limite de temps.
+    """
+    limits = [limit for limit in (None if movetime is None else start + movetime, deadline) if limit is not None]
+    return min(limits) if limits else None
 
 class Engine:
-    def __init__(self, board, current_player='white'):
+    def __init__(self, board, current_player='white', rollout_depth=40, capture_bias=0.8, playouts=1,
+                 workers=1, seed=None, movetime=None, early_stop=True):
         self.board = board
-        self.root_node = Node(self.board, move=None)
+        self.tree = TreeStore()
+        self.root_node = Node(self.tree, self.tree.add_node(self.board))
         self.current_player = current_player
+        # Couleur au trait à la racine : current_player au départ, puis alternée à chaque coup joué (update_root)
+        self.root_player = current_player
+        # Simulations bornées sur échiquier compact (voir RolloutKernel)
+        self.options = dict(rollout_depth=rollout_depth, capture_bias=capture_bias, playouts=playouts,
+                            early_stop=early_stop)
+        self.rollout = RolloutKernel(max_plies=rollout_depth, capture_bias=capture_bias, seed=seed)
+        # playouts > 1 : chaque simulation joue `playouts` parties en parallèle (BatchedPlayouts) et en fait la moyenne
+        self.batch_rollout = BatchedPlayouts(playouts, max_plies=rollout_depth, capture_bias=capture_bias,
+                                             seed=seed) if playouts > 1 else None
+        # workers > 1 : mcts lance `workers` recherches indépendantes en parallèle (voir mcts_parallel)
+        self.workers = workers
+        self.pool = None
+        self.pool_workers = 0
+        self.root_stats = {}  # coup -> [visites, valeur cumulée] de la dernière recherche parallèle
+        # Budget par coup : movetime (secondes) par défaut de mcts ; early_stop arrête la recherche
+        # dès que le coup choisi ne peut plus changer (voir can_stop)
+        self.movetime = movetime
+        self.early_stop = early_stop
+        self.search_iterations = 0
+        self.stop_reason = None  # 'iterations', 'time', 'nodes', 'early' ou 'stopped' pour la dernière recherche
+        # Réflexion pendant le tour de l'adversaire (voir start_pondering) : thread de recherche et signal d'arrêt
+        self.stop_event = threading.Event()
+        self.ponder_thread = None
 
     def selection(self):
         """Sélectionne le meilleur noeud à explorer selon la stratégie UCT"""
         node = self.root_node
         while node.is_fully_expanded():
             node = node.best_child()
+            if node.board is None:  # L'échiquier de l'enfant n'est construit qu'à la première descente
+                node.board = self.simulate_move(node.parent.board, node.move)
         return node
 
     def expansion(self, node):
-        """Génère les nouveaux noeuds (mouvements possibles) à partir du noeud courant"""
-        for move in self.generate_legal_moves(node.board):
-            new_board = self.simulate_move(node.board, move)
-            child_node = Node(new_board, parent=node, move=move)
-            node.children.append(child_node)
+        """Génère les nouveaux noeuds (mouvements possibles du camp au trait) à partir du noeud courant.
+        Seuls les coups sont enregistrés ; les échiquiers des enfants sont construits par selection."""
+        self.tree.add_children(node.index, self.generate_legal_moves(node.board, self.side_to_move(node)))
 
     def simulation(self, node):
-        """Simule une partie à partir de l'état actuel du noeud jusqu'à un état terminal"""
-        board = node.board
-        while not self.is_game_over(board):
-            move = random.choice(self.generate_legal_moves(board))
-            board = self.simulate_move(board, move)
-        return self.evaluate_board(board)
+        """Simule une partie à partir de l'état actuel du noeud, bornée à rollout_depth demi-coups"""
+        if self.batch_rollout is not None:
+            return float(self.batch_rollout.playout(node.board, self.side_to_move(node)).mean())
+        return self.rollout.playout(node.board, self.side_to_move(node))
+
+    def side_to_move(self, node):
+        """
+        Couleur au trait dans le noeud : celle de la racine (root_player) à profondeur paire, l'autre sinon.
+
+        Args:
+            node (Node): Le noeud de l'arbre.
+
+        Returns:
+            str: 'white' ou 'black'.
+        """
+        depth = 0
+        parent = int(self.tree.parent[node.index])
+        while parent >= 0:
+            depth += 1
+            parent = int(self.tree.parent[parent])
+        if depth % 2 == 0:
+            return self.root_player
+        return 'black' if self.root_player == 'white' else 'white'
+
+    def update_root(self, move):
+        """
+        Avance la racine sur le coup joué (par l'IA ou par l'adversaire) en conservant ses statistiques.
+        Après notre coup puis la réponse adverse, le petit-enfant correspondant devient la racine ;
+        le reste de l'arbre est libéré.
+
+        Args:
+            move (tuple): Le mouvement joué (start, end).
+        """
+        self.root_player = 'black' if self.root_player == 'white' else 'white'
+        child = next((c for c in self.root_node.children if c.move == move), None)
+        if child is None:
+            self.tree = TreeStore()
+            self.root_node = Node(self.tree, self.tree.add_node(self.board))
+            return
+        self.tree = self.tree.extract(child.index)
+        self.root_node = Node(self.tree, 0)
+        self.root_node.board = self.board
 
     def backpropagation(self, node, reward):
-        """Propager la récompense vers le parent"""
+        """
+        Propager la récompense vers le parent. La récompense (point de vue des blancs) est comptée dans chaque
+        noeud du point de vue du camp qui a joué le coup menant à lui : best_child maximise ainsi la valeur
+        du camp qui choisit, à chaque profondeur.
+
+        Args:
+            node (Node): La feuille simulée.
+            reward (float): Le résultat de la simulation, du point de vue des blancs.
+        """
+        if self.side_to_move(node) == 'white':
+            reward = -reward  # les noirs ont joué le coup menant à la feuille
         while node:
             node.visits += 1
             node.value += reward
+            reward = -reward
             node = node.parent
 
-    def generate_legal_moves(self, board):
+    def generate_legal_moves(self, board, color=None):
         """
-            Génère tous les mouvements légaux à partir d'un état donné (simplifié ici).
-            Cette méthode doit être appelée avec l'objet Board complet.
+            Génère tous les mouvements légaux de `color` (current_player par défaut) à partir d'un état donné
+            (simplifié ici). Cette méthode doit être appelée avec l'objet Board complet.
         """
+        color = color or self.current_player
         legal_moves = []
         for row in range(8):
             for col in range(8):
                 piece = board.get_piece_at((row, col))  # Utilisez l'objet Board pour obtenir la pièce
-                if piece and piece.color == self.current_player:  # L'IA joue selon sa couleur
+                if piece and piece.color == color:  # Le camp au trait dans ce noeud
                    moves = piece.get_possible_moves((row, col), board)  # Passe l'instance Board
                    for move in moves:
                        if board.is_valid_move((row, col), move):  # Vérifie les mouvements valides
@@ -746,17 +1357,240 @@ class Engine:
         piece = board[start[0]][start[1]] # Access using the nested list
         return piece.is_valid_move(start, end, self.board)
 
-    def mcts(self, iterations=10000):
-        """Exécute l'algorithme MCTS pour déterminer le meilleur coup"""
-        for _ in range(iterations):
+    def mcts(self, iterations=10000, movetime=None, nodes=None, deadline=None):
+        """
+        Exécute l'algorithme MCTS pour déterminer le meilleur coup.
+        La recherche s'arrête à la première limite atteinte ; l'horloge n'est lue que toutes les
+        CLOCK_CHECK_INTERVAL itérations, de même que la règle d'arrêt anticipé (voir can_stop).
+
+        Args:
+            iterations (int): Nombre maximal d'itérations.
+            movetime (float): Durée maximale en secondes (self.movetime par défaut).
+            nodes (int): Nombre maximal de visites de la racine (simulations), sous-arbre réutilisé compris.
+            deadline (float): Instant limite, en valeur de time.perf_counter().
+
+        Returns:
+            tuple: Le meilleur coup (start, end).
+        """
+        if movetime is None:
+            movetime = self.movetime
+        if self.workers > 1:
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                movetime = remaining if movetime is None else min(movetime, remaining)
+            return self.mcts_parallel(iterations, movetime=movetime, nodes=nodes)
+        self.search(iterations, movetime, nodes, deadline)
+
+        # Retourner le meilleur coup basé sur l'UCT après les itérations
+        best_child = self.root_node.best_child(0)
+        if best_child is None:
+            return self.fallback_move()
+        return best_child.move
+
+    def fallback_move(self):
+        """
+        Coup joué quand la recherche s'est arrêtée avant de développer la racine (limite atteinte d'emblée).
+
+        Returns:
+            tuple: Un coup légal tiré au hasard, ou None s'il n'y en a aucun.
+        """
+        moves = self.generate_legal_moves(self.board, self.root_player)
+        return random.choice(moves) if moves else None
+
+    def search(self, iterations=10000, movetime=None, nodes=None, deadline=None, ponder=False):
+        """
+        Itérations MCTS sur l'arbre local, jusqu'à la première limite atteinte (voir mcts) ou jusqu'à ce que
+        stop_event soit levé (arrêt de la réflexion, vérifié à chaque itération).
+
+        Args:
+            iterations (int): Nombre maximal d'itérations (None : sans limite).
+            movetime (float): Durée maximale en secondes.
+            nodes (int): Nombre maximal de visites de la racine (simulations), sous-arbre réutilisé compris.
+            deadline (float): Instant limite, en valeur de time.perf_counter().
+            ponder (bool): Réflexion : sans arrêt anticipé, le coup à jouer n'étant pas encore demandé.
+
+        Returns:
+            int: Le nombre d'itérations effectuées.
+        """
+        start = time.perf_counter()
+        stop_time = search_stop_time(start, movetime, deadline)
+        early_stop = self.early_stop and not ponder
+        if iterations is None:
+            iterations = math.inf
+        # Comme dans nn_mctschesszero, `nodes` compte les simulations : chaque itération visite un noeud,
+        # et les visites d'un sous-arbre réutilisé comptent dans le budget
+        if nodes is not None and nodes - self.root_node.visits < iterations:
+            iterations = max(nodes - self.root_node.visits, 0)
+            self.stop_reason = 'nodes'
+        else:
+            self.stop_reason = 'iterations'
+        done = 0
+        while done < iterations:
+            if self.stop_event.is_set():
+                self.stop_reason = 'stopped'
+                break
+            if done % CLOCK_CHECK_INTERVAL == 0 and done:
+                now = time.perf_counter()
+                remaining = iterations - done
+                if stop_time is not None:
+                    if now >= stop_time:
+                        self.stop_reason = 'time'
+                        break
+                    # Itérations encore possibles au débit observé
+                    remaining = min(remaining, int((stop_time - now) * done / (now - start)) + 1)
+                if early_stop and self.can_stop(remaining):
+                    self.stop_reason = 'early'
+                    break
             node = self.selection()
             self.expansion(node)
             reward = self.simulation(node)
             self.backpropagation(node, reward)
+            done += 1
+        self.search_iterations = done
+        return done
 
-        # Retourner le meilleur coup basé sur l'UCT après les itérations
-        best_child = self.root_node.best_child(0)
-        return best_child.move
+    def start_pondering(self, iterations=None, nodes=None):
+        """
+        Réflexion pendant le tour de l'adversaire : la recherche continue depuis la racine courante dans un
+        thread, jusqu'à stop_pondering (ou jusqu'aux limites données), sans movetime ni arrêt anticipé.
+        input() libère le GIL : l'attente du coup adverse ne ralentit pas la recherche. Une fois le coup joué,
+        update_root en conserve le sous-arbre, d'où repart la recherche suivante.
+
+        Args:
+            iterations (int): Nombre maximal d'itérations de la réflexion (None : jusqu'à stop_pondering).
+            nodes (int): Nombre maximal de visites de la racine.
+        """
+        self.stop_pondering()
+        self.ponder_thread = threading.Thread(target=self.search, args=(iterations,),
+                                              kwargs=dict(nodes=nodes, ponder=True), daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        """
+        Arrête la réflexion en cours (l'itération commencée est terminée) ; sans effet s'il n'y en a pas.
+
+        Returns:
+            int: Le nombre d'itérations de la réflexion.
+        """
+        if self.ponder_thread is None:
+            return 0
+        self.stop_event.set()
+        self.ponder_thread.join()
+        self.ponder_thread = None
+        self.stop_event.clear()
+        return self.search_iterations
+
+    def can_stop(self, remaining):
+        """
+        Règle d'arrêt anticipé : aucun autre enfant de la racine ne peut plus dépasser la meilleure valeur
+        moyenne (le critère de choix de mcts) en `remaining` itérations. Les récompenses étant comprises
+        entre -1 et 1, la borne est prudente : l'enfant choisi peut recevoir toutes les itérations restantes
+        à -1, et chaque rival toutes à +1. Un coup unique est joué sans chercher davantage.
+
+        Args:
+            remaining (int): Nombre d'itérations encore possibles.
+
+        Returns:
+            bool: True si le coup choisi ne peut plus changer.
+        """
+        tree = self.tree
+        start = int(tree.child_start[self.root_node.index])
+        end = start + int(tree.child_count[self.root_node.index])
+        if end - start < 2:
+            return end - start == 1
+        visits = tree.visits[start:end]
+        values = tree.value[start:end]
+        best = int(np.argmax(values / (visits + 1e-6)))
+        floor = (values[best] - remaining) / (visits[best] + remaining)
+        ceilings = (values + remaining) / (visits + remaining)
+        ceilings[best] = -np.inf
+        return ceilings.max() < floor
+
+    def mcts_parallel(self, iterations=10000, workers=None, movetime=None, nodes=None):
+        """
+        Parallélisation à la racine : `workers` recherches indépendantes (graines différentes) depuis le même
+        échiquier, dans un pool de processus conservé d'un coup à l'autre. Les visites et valeurs des enfants
+        de la racine sont additionnées, avec celles de l'arbre local (conservées par update_root, par exemple
+        après une réflexion), puis le coup est choisi comme dans mcts (meilleure valeur moyenne).
+
+        Args:
+            iterations (int): Nombre d'itérations de chaque processus.
+            workers (int): Nombre de processus (self.workers par défaut).
+            movetime (float): Durée maximale de chaque recherche, en secondes.
+            nodes (int): Nombre maximal de simulations de chaque processus.
+
+        Returns:
+            tuple: Le meilleur coup (start, end).
+        """
+        workers = workers or self.workers
+        if self.pool is None or self.pool_workers != workers:
+            self.close()
+            self.pool = mp.get_context('spawn').Pool(workers)
+            self.pool_workers = workers
+        tasks = [(self.board, self.root_player, iterations, random.randrange(2**31), self.options,
+                  movetime, nodes) for _ in range(workers)]
+        merged = {child.move: [child.visits, child.value] for child in self.root_node.children}
+        self.search_iterations = 0
+        for children, done in self.pool.map(_root_search, tasks):
+            self.search_iterations += done  # itérations effectuées, tous processus confondus
+            for move, visits, value in children:
+                total = merged.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += value
+        self.root_stats = merged
+        # L'arbre local ne contient plus la recherche : il repart de la position courante
+        self.tree = TreeStore()
+        self.root_node = Node(self.tree, self.tree.add_node(self.board))
+        if not merged:
+            return self.fallback_move()
+        return max(merged, key=lambda move: merged[move][1] / (merged[move][0] + 1e-6))
+
+    def close(self):
+        """Arrête la réflexion en cours et le pool de processus de mcts_parallel"""
+        self.stop_pondering()
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def benchmark_parallel(self, iterations=1000, workers=(2, 4)):
+        """
+        Compare le débit (itérations par seconde, tous processus confondus) de mcts_parallel à celui d'une
+        recherche dans un seul processus : à temps égal, l'accélération est le rapport des deux débits.
+        Comme dans nn_mctschesszero.Engine.benchmark, l'arrêt anticipé est désactivé et chaque mesure part d'un
+        arbre vide ; les débits sont calculés sur les itérations réellement effectuées.
+
+        Args:
+            iterations (int): Itérations par recherche (par processus en mode parallèle).
+            workers (tuple): Nombres de processus à mesurer.
+
+        Returns:
+            dict: Accélération pour chaque nombre de processus.
+        """
+        saved = self.workers, self.early_stop
+        self.workers, self.early_stop = 1, False
+        self.options['early_stop'] = False  # aussi pour les processus de mcts_parallel
+        self.close()  # le pool est recréé avec les options de mesure
+        self.tree = TreeStore()
+        self.root_node = Node(self.tree, self.tree.add_node(self.board))
+        start = time.perf_counter()
+        self.mcts(iterations)
+        single = self.search_iterations / (time.perf_counter() - start)
+        print(f"1 processus : {single:9.1f} itérations/s")
+        speedups = {}
+        for count in workers:
+            self.mcts_parallel(iterations, count)  # démarrage du pool hors mesure
+            start = time.perf_counter()
+            self.mcts_parallel(iterations, count)
+            rate = self.search_iterations / (time.perf_counter() - start)
+            speedups[count] = rate / single
+            print(f"{count} processus : {rate:9.1f} itérations/s (x{speedups[count]:.2f})")
+        self.workers, self.early_stop = saved
+        self.options['early_stop'] = self.early_stop
+        self.close()
+        self.tree = TreeStore()
+        self.root_node = Node(self.tree, self.tree.add_node(self.board))
+        return speedups
 
 """#Main
 Main (exécution du jeu)
@@ -764,11 +1598,12 @@ Main (exécution du jeu)
 """
 
 class Main:
-    def __init__(self):
+    def __init__(self, ponder=True):
         self.board = Board()
         self.engine = Engine(self.board, current_player='white') #joueur IA
         self.current_player = 'black' #joueur humain
         self.game_over = False
+        self.ponder = ponder  # le moteur réfléchit pendant que le joueur humain saisit son coup
 
     def play(self):
         """Lance la partie et gère les tours de jeu"""
@@ -780,8 +1615,11 @@ class Main:
                 print("C'est au tour des noirs.")
 
             if self.current_player == 'white':
-                # Si le joueur humain joue pour les blancs
+                # Si le joueur humain joue pour les blancs ; le moteur réfléchit pendant la saisie
+                if self.ponder:
+                    self.engine.start_pondering()
                 move = self.get_human_move()
+                self.engine.stop_pondering()  # avant de modifier l'échiquier partagé avec la recherche
             else:
                 # Moteur MCTS pour les noirs
                 move = self.engine.mcts()
@@ -791,6 +1629,7 @@ class Main:
             if not self.board.move(start, end):
                 print("Mouvement invalide, réessayez.")
                 continue
+            self.engine.update_root(move)  # Réutilise le sous-arbre du coup joué
 
             if self.is_game_over():
                 self.board.display()